@@ -1,14 +1,14 @@
 """Auto Area Assign integration."""
 from __future__ import annotations
 
-import asyncio
+import functools
 import logging
-from dataclasses import dataclass
-from typing import Iterable, List, Sequence
+from dataclasses import dataclass, field
+from typing import Iterable
 
-from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, callback
 from homeassistant.helpers import area_registry as ar, device_registry as dr, entity_registry as er
+from homeassistant.helpers.start import async_at_started
 from homeassistant.util import slugify
 
 DOMAIN = "auto_area_assign"
@@ -16,15 +16,30 @@ SERVICE_REFRESH = "refresh"
 LABEL_IGNORE = "auto_area_ignore"
 LABEL_SYSTEM = "system"
 CONF_HIDE_SYSTEM_ENTITIES = "hide_system_entities"
+# hass.data key of the callable cancelling the pending startup run
+DATA_STARTED_UNSUB = "started_unsub"
+# Registries with more entities than this are matched in the executor
+EXECUTOR_MATCH_THRESHOLD = 2000
 _LOGGER = logging.getLogger(__name__)
 
+# Area names and aliases rarely change between refreshes
+_slugify = functools.lru_cache(maxsize=1024)(slugify)
+
 
 @dataclass
-class AliasMapping:
-    """Represents the relation between an alias slug and an area id."""
+class _AliasTrie:
+    """Character-level prefix trie mapping alias slugs to area ids."""
+
+    children: dict[str, _AliasTrie] = field(default_factory=dict)
+    area_id: str | None = None
 
-    slug: str
-    area_id: str
+    def insert(self, slug: str, area_id: str) -> None:
+        """Insert a slug, keeping the first area registered for it."""
+        node = self
+        for char in slug:
+            node = node.children.setdefault(char, _AliasTrie())
+        if node.area_id is None:
+            node.area_id = area_id
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
@@ -43,13 +58,13 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 
     hass.services.async_register(DOMAIN, SERVICE_REFRESH, _handle_refresh_service)
 
-    async def _run_on_start(_: object) -> None:
-        await _async_assign_areas(hass)
-
-    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, _run_on_start)
+    @callback
+    def _run_on_start(hass: HomeAssistant) -> None:
+        hass.async_create_task(_async_assign_areas(hass), eager_start=True)
 
-    # Run shortly after startup in case Home Assistant is already running.
-    hass.async_create_task(_async_assign_areas(hass))
+    # Runs once: now if Home Assistant has started, otherwise when it has.
+    # Loading while it is still starting must wait for the registries to settle.
+    hass.data[DOMAIN][DATA_STARTED_UNSUB] = async_at_started(hass, _run_on_start)
 
     return True
 
@@ -62,24 +77,54 @@ async def _async_assign_areas(hass: HomeAssistant) -> None:
 
     alias_map = _build_alias_map(area_registry.async_list_areas())
 
-    if not alias_map:
+    if not alias_map.children:
         _LOGGER.info("Alias map is empty, nothing to assign")
         return
 
     device_assignments = 0
     entity_assignments = 0
     skipped_ignored = 0
-    skipped_existing_area = 0
 
-    for entity in entity_registry.entities.values():
-        # Extract object_id from entity_id (format: domain.object_id)
-        object_id = entity.entity_id.split(".", 1)[1] if "." in entity.entity_id else entity.entity_id
-        area_id = _match_area_id(alias_map, object_id)
-        if not area_id:
+    # Standalone entities that already have an area are skipped before matching;
+    # device areas are checked per device below, once a match needs one
+    entities = [
+        entity
+        for entity in entity_registry.entities.values()
+        if entity.device_id or not entity.area_id
+    ]
+    if len(entities) > EXECUTOR_MATCH_THRESHOLD:
+        # Registry entries are immutable, so matching can run off the event loop
+        matches = await hass.async_add_executor_job(
+            _match_entities, alias_map, entities
+        )
+    else:
+        matches = _match_entities(alias_map, entities)
+
+    # Read labels after matching, the registries may have changed during the await
+    ignored_entities = {
+        entry.entity_id
+        for entry in er.async_entries_for_label(entity_registry, LABEL_IGNORE)
+    }
+    ignored_devices = {
+        entry.id for entry in dr.async_entries_for_label(device_registry, LABEL_IGNORE)
+    }
+
+    get_device = device_registry.async_get
+    get_entity = entity_registry.async_get
+    update_device = device_registry.async_update_device
+    update_entity = entity_registry.async_update_entity
+
+    decided_devices: set[str] = set()
+
+    for matched, area_id in matches:
+        # Use the current entry, the match may be stale after executor matching
+        entity = get_entity(matched.entity_id)
+        if entity is None:
+            _LOGGER.debug("Entity %s was removed, skipping", matched.entity_id)
             continue
 
         # Check if entity has auto_area_ignore label
-        if LABEL_IGNORE in entity.labels:
+        if entity.entity_id in ignored_entities:
             skipped_ignored += 1
             _LOGGER.debug(
                 "Entity %s has label %s, skipping", entity.entity_id, LABEL_IGNORE
@@ -87,26 +132,29 @@ async def _async_assign_areas(hass: HomeAssistant) -> None:
             continue
 
         device_id = entity.device_id
-        
+
         if device_id:
-            # Entity has a device - assign area to device
-            device = device_registry.async_get(device_id)
-            if device is None:
-                _LOGGER.debug(
-                    "Entity %s references unknown device %s", entity.entity_id, device_id
-                )
+            # Entity has a device - assign area to device, deciding once per device
+            if device_id in decided_devices:
                 continue
+            decided_devices.add(device_id)
 
             # Check if device has auto_area_ignore label
-            if LABEL_IGNORE in device.labels:
+            if device_id in ignored_devices:
                 skipped_ignored += 1
                 _LOGGER.debug(
                     "Device %s has label %s, skipping", device_id, LABEL_IGNORE
                 )
                 continue
 
+            device = get_device(device_id)
+            if device is None:
+                _LOGGER.debug(
+                    "Entity %s references unknown device %s", entity.entity_id, device_id
+                )
+                continue
+
             if device.area_id:
-                skipped_existing_area += 1
                 _LOGGER.debug(
                     "Device %s already assigned to area %s, skipping",
                     device_id,
@@ -114,9 +162,9 @@ async def _async_assign_areas(hass: HomeAssistant) -> None:
                 )
                 continue
 
-            device_registry.async_update_device(device_id, area_id=area_id)
+            update_device(device_id, area_id=area_id)
             device_assignments += 1
-            _LOGGER.info(
+            _LOGGER.debug(
                 "Assigned area %s to device %s via entity %s",
                 area_id,
                 device_id,
@@ -125,17 +173,16 @@ async def _async_assign_areas(hass: HomeAssistant) -> None:
         else:
             # Entity has no device - assign area to entity itself
             if entity.area_id:
-                skipped_existing_area += 1
                 _LOGGER.debug(
-                    "Entity %s already assigned to area %s, skipping",
+                    "Entity %s got area %s during matching, skipping",
                     entity.entity_id,
                     entity.area_id,
                 )
                 continue
 
-            entity_registry.async_update_entity(entity.entity_id, area_id=area_id)
+            update_entity(entity.entity_id, area_id=area_id)
             entity_assignments += 1
-            _LOGGER.info(
+            _LOGGER.debug(
                 "Assigned area %s to entity %s (no device)",
                 area_id,
                 entity.entity_id,
@@ -143,10 +190,9 @@ async def _async_assign_areas(hass: HomeAssistant) -> None:
 
     _LOGGER.info(
         "Auto area assignment finished: %s devices updated, %s entities updated, "
-        "%s items with existing area, %s items ignored by label",
+        "%s items ignored by label",
         device_assignments,
         entity_assignments,
-        skipped_existing_area,
         skipped_ignored,
     )
     
@@ -170,10 +216,7 @@ async def _async_hide_system_device_entities(
     hidden_count = 0
     
     # Find all devices with "system" label
-    system_devices = [
-        device for device in device_registry.devices.values()
-        if LABEL_SYSTEM in device.labels
-    ]
+    system_devices = dr.async_entries_for_label(device_registry, LABEL_SYSTEM)
     
     if not system_devices:
         _LOGGER.debug("No devices with 'system' label found")
@@ -181,74 +224,91 @@ async def _async_hide_system_device_entities(
     
     _LOGGER.info("Found %s devices with 'system' label", len(system_devices))
     
+    # Resolve these once instead of on every entity
+    hide_by = er.RegistryEntryHider.INTEGRATION
+    already_hidden = (er.RegistryEntryHider.USER, hide_by)
+    update_entity = entity_registry.async_update_entity
+
     # Hide all entities of these devices
     for device in system_devices:
         device_entities = er.async_entries_for_device(
             entity_registry, device.id, include_disabled_entities=True
         )
-        
-        for entity in device_entities:
-            # Check if entity is already hidden
-            if entity.hidden_by == er.RegistryEntryHider.USER:
-                _LOGGER.debug(
-                    "Entity %s is already hidden by user, skipping", entity.entity_id
-                )
-                continue
-            
-            if entity.hidden_by == er.RegistryEntryHider.INTEGRATION:
-                _LOGGER.debug(
-                    "Entity %s is already hidden by integration", entity.entity_id
-                )
-                continue
-                
-            # Hide the entity
-            entity_registry.async_update_entity(
-                entity.entity_id,
-                hidden_by=er.RegistryEntryHider.INTEGRATION
-            )
-            hidden_count += 1
+
+        # Entities already hidden by the user or by an integration are left alone
+        to_hide = [
+            entity.entity_id
+            for entity in device_entities
+            if entity.hidden_by not in already_hidden
+        ]
+        if not to_hide:
+            continue
+
+        device_label = device.name or device.name_by_user or "unknown"
+        for entity_id in to_hide:
+            update_entity(entity_id, hidden_by=hide_by)
             _LOGGER.debug(
                 "Hidden entity %s (device: %s, name: %s)",
-                entity.entity_id,
+                entity_id,
                 device.id,
-                device.name or device.name_by_user or "unknown"
+                device_label,
             )
-    
+        hidden_count += len(to_hide)
+
     return hidden_count
 
 
-def _build_alias_map(areas: Iterable[ar.AreaEntry]) -> List[AliasMapping]:
-    """Build a list of alias mappings sorted by alias length."""
-    mappings: List[AliasMapping] = []
+def _build_alias_map(areas: Iterable[ar.AreaEntry]) -> _AliasTrie:
+    """Build a prefix trie of area name and alias slugs."""
+    root = _AliasTrie()
 
     for area in areas:
-        alias_candidates = {area.name, *area.aliases}
-        for name in alias_candidates:
-            slug = slugify(name)
+        # Duplicate slugs are harmless, the trie keeps the first insertion
+        for name in (area.name, *area.aliases):
+            slug = _slugify(name)
             if not slug:
                 continue
-            mappings.append(AliasMapping(slug=slug, area_id=area.id))
+            root.insert(slug, area.id)
+
+    return root
 
-    mappings.sort(key=lambda item: len(item.slug), reverse=True)
-    return mappings
 
+def _match_entities(
+    alias_map: _AliasTrie, entities: Iterable[er.RegistryEntry]
+) -> list[tuple[er.RegistryEntry, str]]:
+    """Pair each entity whose object_id matches an alias with its area_id."""
+    matches: list[tuple[er.RegistryEntry, str]] = []
 
-def _match_area_id(alias_map: Sequence[AliasMapping], object_id: str | None) -> str | None:
-    """Find an area_id that matches the given object_id."""
+    for entity in entities:
+        # Extract object_id from entity_id (format: domain.object_id)
+        object_id = entity.entity_id.partition(".")[2] or entity.entity_id
+        area_id = _match_area_id(alias_map, object_id)
+        if area_id:
+            matches.append((entity, area_id))
+
+    return matches
+
+
+def _match_area_id(alias_map: _AliasTrie, object_id: str | None) -> str | None:
+    """Find the area_id of the longest alias slug prefixing object_id."""
     if not object_id:
         return None
 
-    for mapping in alias_map:
-        if object_id.startswith(mapping.slug):
-            return mapping.area_id
-    return None
+    node = alias_map
+    matched: str | None = None
+    for char in object_id:
+        node = node.children.get(char)
+        if node is None:
+            break
+        if node.area_id is not None:
+            matched = node.area_id
+    return matched
 
 
 async def async_unload_entry(hass: HomeAssistant, entry) -> bool:
     """Handle unloading the integration (placeholder for future config entries)."""
-    tasks = [
-        hass.services.async_remove(domain=DOMAIN, service=SERVICE_REFRESH),
-    ]
-    await asyncio.gather(*tasks, return_exceptions=True)
+    hass.services.async_remove(domain=DOMAIN, service=SERVICE_REFRESH)
+    if unsub := hass.data.get(DOMAIN, {}).pop(DATA_STARTED_UNSUB, None):
+        unsub()
     return True
 
@@ -3,31 +3,54 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Coroutine, Iterable
 
-from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
-from homeassistant.core import Event, HomeAssistant, ServiceCall, State, callback
+from homeassistant.const import (
+    EVENT_HOMEASSISTANT_STARTED,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+)
+from homeassistant.core import (
+    Event,
+    HassJobType,
+    HomeAssistant,
+    ServiceCall,
+    State,
+    callback,
+)
 from homeassistant.helpers import (
     area_registry as ar,
     device_registry as dr,
     entity_registry as er,
 )
 from homeassistant.helpers.event import async_track_state_change_event, async_track_time_interval
-from homeassistant.util import dt as dt_util
+from homeassistant.helpers.storage import Store
 
 DOMAIN = "climate_sync"
 SERVICE_REFRESH = "refresh"
+STORAGE_KEY = f"{DOMAIN}.topology"
+STORAGE_VERSION = 1
+# Delay before writing a changed topology to storage
+STORAGE_SAVE_DELAY = 10  # seconds
 _LOGGER = logging.getLogger(__name__)
 
 # Interval for periodic forced sync
 SYNC_INTERVAL = timedelta(minutes=10)
 # Temperature tolerance - minimum difference to trigger sync
 TEMPERATURE_TOLERANCE = 0.5  # °C
+# Maximum time to wait for a TRV to accept a new external temperature
+SERVICE_CALL_TIMEOUT = 5  # seconds
+# Consecutive timeouts after which a TRV is skipped for one sync interval
+MAX_CONSECUTIVE_TIMEOUTS = 3
+# States that carry no temperature value
+_NO_VALUE_STATES = frozenset({STATE_UNKNOWN, STATE_UNAVAILABLE})
+# Window in which state changes of TRV and sensor entities are coalesced
+SYNC_DEBOUNCE = 0.1  # seconds
 
 
-@dataclass
+@dataclass(slots=True)
 class TRVZBDevice:
     """Represents a TRVZB device with its entities."""
 
@@ -36,8 +59,13 @@ class TRVZBDevice:
     area_id: str
     select_entity_id: str  # select.xxx_temperature_sensor_select
     number_entity_id: str  # number.xxx_external_temperature_input
+    temp_sensor_id: str  # area temperature sensor, e.g. sensor.xxx_temperature
     climate_entity_id: str | None = None  # climate.xxx entity
-    last_sync: datetime | None = None
+    # Runtime sync state, not part of the device topology
+    last_sync_monotonic: float | None = field(default=None, compare=False)  # loop time
+    last_written: float | None = field(default=None, compare=False)  # last set_value
+    timeouts: int = field(default=0, compare=False)  # consecutive set_value timeouts
+    backoff_until: float | None = field(default=None, compare=False)  # loop time
 
 
 class ClimateSync:
@@ -46,299 +74,573 @@ class ClimateSync:
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize the climate sync coordinator."""
         self.hass = hass
+        # Registries live as long as Home Assistant, resolve them once
+        self.area_registry = ar.async_get(hass)
+        self.device_registry = dr.async_get(hass)
+        self.entity_registry = er.async_get(hass)
         self.devices: dict[str, TRVZBDevice] = {}
-        self.area_listeners: dict[str, Any] = {}
+        # Entity id -> TRV devices to sync when that entity changes state
+        self.entity_devices: dict[str, list[TRVZBDevice]] = {}
+        self.state_unsub: Any = None
+        # Area sensor id -> last reading that triggered a sync
+        self.last_sensor_values: dict[str, float] = {}
         self.timer_unsub: Any = None
-        self.setup_done: bool = False
+        # Device ids waiting for the debounced sync and the timer flushing them
+        self.pending_sync: set[str] = set()
+        self.pending_sync_handle: asyncio.TimerHandle | None = None
+        # Device ids with a sync in flight, a device is synced by one caller at a time
+        self.syncing: set[str] = set()
+        self.registry_unsubs: list[Any] = []
+        # Removes the pending Home Assistant started listener
+        self.started_unsub: Any = None
+        self.store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # Tasks started by the coordinator, cancelled on unload
+        self.background_tasks: set[asyncio.Task] = set()
+        self.setup_started: bool = False
+        # Set once setup finished, so concurrent callers can wait for it
+        self.setup_done = asyncio.Event()
 
     async def async_setup(self) -> None:
         """Set up climate sync."""
-        # Prevent double setup
-        if self.setup_done:
-            _LOGGER.debug("Setup already done, skipping")
+        # Prevent double setup, a concurrent caller waits for the running one
+        if self.setup_started:
+            _LOGGER.debug("Setup already started, waiting for it to finish")
+            await self.setup_done.wait()
             return
-        
-        self.setup_done = True
-        await self.async_discover_devices()
-        await self.async_setup_external_mode()
-        await self.async_setup_listeners()
-        
-        # Setup periodic sync timer
-        self.timer_unsub = async_track_time_interval(
-            self.hass, self._async_periodic_sync, SYNC_INTERVAL
-        )
+
+        self.setup_started = True
+        self.setup_done.clear()
+        try:
+            # Start from the topology known at shutdown and validate it in the background
+            if await self._async_load_topology():
+                await self.async_setup_listeners()
+                # Rediscovery sets external mode once it has validated the devices
+                self._async_create_task(self._async_rediscover())
+            else:
+                await self.async_discover_devices()
+                self._async_save_topology()
+                await self.async_setup_external_mode()
+                await self.async_setup_listeners()
+
+            # Setup periodic sync timer
+            self.timer_unsub = async_track_time_interval(
+                self.hass, self._async_periodic_sync, SYNC_INTERVAL
+            )
+
+            # Follow registry changes so devices are re-indexed individually
+            self.registry_unsubs = [
+                self.hass.bus.async_listen(
+                    dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_device_registry_updated
+                ),
+                self.hass.bus.async_listen(
+                    er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_entity_registry_updated
+                ),
+                self.hass.bus.async_listen(
+                    ar.EVENT_AREA_REGISTRY_UPDATED, self._async_area_registry_updated
+                ),
+            ]
+        except BaseException:
+            # Allow a later call to retry instead of leaving setup half-done
+            self.setup_started = False
+            raise
+        finally:
+            # Never leave concurrent callers waiting on a failed attempt
+            self.setup_done.set()
+
+    @callback
+    def _async_create_task(
+        self, target: Coroutine[Any, Any, Any], **kwargs: Any
+    ) -> asyncio.Task:
+        """Create a task that async_unload cancels if it is still running."""
+        task = self.hass.async_create_task(target, **kwargs)
+        self.background_tasks.add(task)
+        task.add_done_callback(self.background_tasks.discard)
+        return task
+
+    async def _async_load_topology(self) -> bool:
+        """Load devices discovered in a previous run, return True if any were."""
+        data = await self.store.async_load()
+        if not data:
+            return False
+
+        try:
+            devices = [TRVZBDevice(**item) for item in data["devices"]]
+        except (KeyError, TypeError) as e:
+            _LOGGER.warning("Ignoring invalid stored TRVZB topology: %s", e)
+            return False
+
+        self.devices = {device.device_id: device for device in devices}
+        _LOGGER.info("Restored %d TRVZB devices from storage", len(self.devices))
+        return bool(self.devices)
+
+    @callback
+    def _async_save_topology(self) -> None:
+        """Schedule writing the current device topology to storage."""
+        self.store.async_delay_save(self._topology_data, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _topology_data(self) -> dict[str, Any]:
+        """Return the topology fields of all devices for storage."""
+        topology_fields = [item.name for item in fields(TRVZBDevice) if item.compare]
+        return {
+            "devices": [
+                {name: getattr(device, name) for name in topology_fields}
+                for device in self.devices.values()
+            ]
+        }
 
     async def async_discover_devices(self) -> None:
         """Discover all TRVZB devices in areas with temperature sensors."""
-        area_registry = ar.async_get(self.hass)
-        device_registry = dr.async_get(self.hass)
-        entity_registry = er.async_get(self.hass)
-
         self.devices.clear()
         discovered_count = 0
 
-        for area in area_registry.async_list_areas():
-            # Skip areas without temperature sensor
-            if not hasattr(area, 'temperature_entity_id') or not area.temperature_entity_id:
-                _LOGGER.debug("Area %s has no temperature_entity_id, skipping", area.name)
+        for area in self.area_registry.async_list_areas():
+            # Only areas with a temperature sensor can drive a TRV
+            if not area.temperature_entity_id:
                 continue
 
-            _LOGGER.debug(
-                "Processing area %s with temperature sensor %s",
-                area.name,
-                area.temperature_entity_id,
-            )
-
-            # Find all TRVZB devices in this area
-            for device in device_registry.devices.values():
-                if device.area_id != area.id:
-                    continue
-
-                # Check if device is TRVZB by model_id
-                if not hasattr(device, 'model_id') or device.model_id != "TRVZB":
+            for device in dr.async_entries_for_area(self.device_registry, area.id):
+                trv_device = self._build_trv_device(device)
+                if trv_device is None:
                     continue
 
-                _LOGGER.debug("Found TRVZB device: %s in area %s", device.name, area.name)
+                self.devices[device.id] = trv_device
+                discovered_count += 1
 
-                # Find required entities for this device
-                select_entity = None
-                number_entity = None
-                climate_entity = None
+        _LOGGER.info("Discovered %d TRVZB devices", discovered_count)
 
-                for entity in entity_registry.entities.values():
-                    if entity.device_id != device.id:
-                        continue
+    @callback
+    def _build_trv_device(self, device: dr.DeviceEntry) -> TRVZBDevice | None:
+        """Build the TRVZBDevice record for a device, or None if it is not usable."""
+        # Check if device is TRVZB by model_id
+        if device.model_id != "TRVZB" or not device.area_id:
+            return None
 
-                    # Look for climate entity
-                    if entity.domain == "climate":
-                        climate_entity = entity.entity_id
+        # Skip areas without temperature sensor
+        area = self.area_registry.async_get_area(device.area_id)
+        if area is None or not area.temperature_entity_id:
+            _LOGGER.debug(
+                "Area of TRVZB device %s has no temperature_entity_id, skipping",
+                device.name,
+            )
+            return None
 
-                    # Look for temperature_sensor_select entity
-                    if (
-                        entity.domain == "select"
-                        and "temperature_sensor" in entity.entity_id
-                    ):
-                        select_entity = entity.entity_id
+        _LOGGER.debug(
+            "Found TRVZB device: %s in area %s with temperature sensor %s",
+            device.name,
+            area.name,
+            area.temperature_entity_id,
+        )
 
-                    # Look for external_temperature_input entity
-                    if (
-                        entity.domain == "number"
-                        and "external_temperature_input" in entity.entity_id
-                    ):
-                        number_entity = entity.entity_id
+        # Find required entities for this device
+        select_entity = None
+        number_entity = None
+        climate_entity = None
+
+        for entity in er.async_entries_for_device(self.entity_registry, device.id):
+            # Look for climate entity
+            if entity.domain == "climate":
+                climate_entity = entity.entity_id
+
+            # Look for temperature_sensor_select entity
+            if (
+                entity.domain == "select"
+                and "temperature_sensor" in entity.entity_id
+            ):
+                select_entity = entity.entity_id
+
+            # Look for external_temperature_input entity
+            if (
+                entity.domain == "number"
+                and "external_temperature_input" in entity.entity_id
+            ):
+                number_entity = entity.entity_id
+
+        if not select_entity or not number_entity:
+            _LOGGER.warning(
+                "TRVZB device %s missing required entities (select: %s, number: %s)",
+                device.name,
+                select_entity,
+                number_entity,
+            )
+            return None
+
+        _LOGGER.info(
+            "Registered TRVZB device %s in area %s (climate: %s, select: %s, number: %s)",
+            device.name,
+            area.name,
+            climate_entity,
+            select_entity,
+            number_entity,
+        )
 
-                if not select_entity or not number_entity:
-                    _LOGGER.warning(
-                        "TRVZB device %s missing required entities (select: %s, number: %s)",
-                        device.name,
-                        select_entity,
-                        number_entity,
-                    )
-                    continue
+        return TRVZBDevice(
+            device_id=device.id,
+            device_name=device.name or device.id,
+            area_id=area.id,
+            select_entity_id=select_entity,
+            number_entity_id=number_entity,
+            temp_sensor_id=area.temperature_entity_id,
+            climate_entity_id=climate_entity,
+        )
 
-                trv_device = TRVZBDevice(
-                    device_id=device.id,
-                    device_name=device.name or device.id,
-                    area_id=area.id,
-                    select_entity_id=select_entity,
-                    number_entity_id=number_entity,
-                    climate_entity_id=climate_entity,
-                )
+    @callback
+    def _async_device_registry_updated(self, event: Event) -> None:
+        """Re-index a device after it changed in the device registry."""
+        self._async_schedule_reconcile({event.data["device_id"]})
+
+    @callback
+    def _async_entity_registry_updated(self, event: Event) -> None:
+        """Re-index the devices affected by an entity registry change."""
+        device_ids: set[str] = set()
+        for entity_id in (event.data["entity_id"], event.data.get("old_entity_id")):
+            device_ids.update(
+                device.device_id for device in self.entity_devices.get(entity_id, ())
+            )
 
-                self.devices[device.id] = trv_device
-                discovered_count += 1
+        entry = self.entity_registry.async_get(event.data["entity_id"])
+        if entry is not None and entry.device_id:
+            device_ids.add(entry.device_id)
+
+        self._async_schedule_reconcile(device_ids)
+
+    @callback
+    def _async_area_registry_updated(self, event: Event) -> None:
+        """Re-index the devices of an area after the area changed."""
+        area_id = event.data["area_id"]
+        device_ids = {
+            device.id
+            for device in dr.async_entries_for_area(self.device_registry, area_id)
+        }
+        device_ids.update(
+            device.device_id
+            for device in self.devices.values()
+            if device.area_id == area_id
+        )
+        self._async_schedule_reconcile(device_ids)
+
+    @callback
+    def _async_schedule_reconcile(self, device_ids: set[str]) -> None:
+        """Schedule re-indexing of tracked devices and TRVZB candidates."""
+        candidates = set()
+        for device_id in device_ids:
+            if device_id in self.devices:
+                candidates.add(device_id)
+                continue
+            entry = self.device_registry.async_get(device_id)
+            if entry is not None and entry.model_id == "TRVZB":
+                candidates.add(device_id)
+
+        if candidates:
+            self._async_create_task(self._async_reconcile_devices(candidates))
+
+    async def _async_reconcile_devices(self, device_ids: set[str]) -> None:
+        """Rebuild the records of the given devices and apply any changes."""
+        changed: list[TRVZBDevice] = []
+        removed = 0
+        for device_id in device_ids:
+            entry = self.device_registry.async_get(device_id)
+            new_device = self._build_trv_device(entry) if entry is not None else None
+            old_device = self.devices.get(device_id)
+            if new_device == old_device:
+                continue
 
-                _LOGGER.info(
-                    "Registered TRVZB device %s in area %s (climate: %s, select: %s, number: %s)",
-                    device.name,
-                    area.name,
-                    climate_entity,
-                    select_entity,
-                    number_entity,
-                )
+            if new_device is None:
+                _LOGGER.info("Removed TRVZB device %s", old_device.device_name)
+                del self.devices[device_id]
+                removed += 1
+            else:
+                self.devices[device_id] = new_device
+                changed.append(new_device)
 
-        _LOGGER.info("Discovered %d TRVZB devices", discovered_count)
+        if not changed and not removed:
+            return
 
-    async def async_setup_external_mode(self) -> None:
-        """Set all TRVZB devices to use external temperature sensor."""
-        for device in self.devices.values():
-            try:
-                current_state = self.hass.states.get(device.select_entity_id)
-                if not current_state:
-                    _LOGGER.warning(
-                        "Select entity %s not ready yet for %s, will set external mode on first update",
-                        device.select_entity_id,
-                        device.device_name,
-                    )
-                    continue
-                
-                if current_state.state != "external":
-                    _LOGGER.info(
-                        "Setting %s to external mode (was: %s)",
-                        device.device_name,
-                        current_state.state,
-                    )
-                    await self.hass.services.async_call(
-                        "select",
-                        "select_option",
-                        {
-                            "entity_id": device.select_entity_id,
-                            "option": "external",
-                        },
-                        blocking=True,
-                    )
-                else:
-                    _LOGGER.debug(
-                        "%s already in external mode", device.device_name
-                    )
-            except Exception as e:
-                _LOGGER.error(
-                    "Failed to set external mode for %s: %s",
+        await self.async_setup_listeners()
+        self._async_save_topology()
+        await self.async_setup_external_mode(changed)
+        await self._async_sync_devices(changed)
+
+    async def async_setup_external_mode(
+        self, devices: Iterable[TRVZBDevice] | None = None
+    ) -> None:
+        """Set TRVZB devices (all by default) to use external temperature sensor."""
+        pending = []
+        for device in self.devices.values() if devices is None else devices:
+            current_state = self.hass.states.get(device.select_entity_id)
+            if not current_state:
+                _LOGGER.warning(
+                    "Select entity %s not ready yet for %s, will set external mode on first update",
+                    device.select_entity_id,
                     device.device_name,
-                    e,
                 )
+                continue
+
+            if current_state.state != "external":
+                pending.append(
+                    self._async_set_external_mode(device, current_state.state)
+                )
+            else:
+                _LOGGER.debug(
+                    "%s already in external mode", device.device_name
+                )
+
+        # Only devices that need switching reach the service registry
+        await asyncio.gather(*pending)
+
+    async def _async_set_external_mode(
+        self, device: TRVZBDevice, current_mode: str
+    ) -> None:
+        """Switch a TRVZB device to the external temperature sensor."""
+        try:
+            _LOGGER.info(
+                "Setting %s to external mode (was: %s)",
+                device.device_name,
+                current_mode,
+            )
+            # No need to wait, the select state change confirms or re-triggers it
+            await self.hass.services.async_call(
+                "select",
+                "select_option",
+                {
+                    "entity_id": device.select_entity_id,
+                    "option": "external",
+                },
+            )
+        except Exception as e:
+            _LOGGER.error(
+                "Failed to set external mode for %s: %s",
+                device.device_name,
+                e,
+            )
 
     async def async_setup_listeners(self) -> None:
-        """Set up state change listeners for TRV entities."""
-        # Setup listener for each TRV device to react to its own state changes
+        """Set up a single state change listener for TRV and area sensor entities."""
+        # Replaces the listener of a previous topology
+        self._async_remove_listeners()
         for device in self.devices.values():
-            # Collect all entity IDs for this device
+            # TRV entities trigger a sync check of their own device
             entity_ids = [device.select_entity_id, device.number_entity_id]
             if device.climate_entity_id:
                 entity_ids.append(device.climate_entity_id)
+            for entity_id in entity_ids:
+                self.entity_devices.setdefault(entity_id, []).append(device)
 
-            @callback
-            def _make_listener(device: TRVZBDevice):
-                """Create a listener for specific TRV device."""
-                
-                async def _async_trv_state_changed(event: Event) -> None:
-                    """Handle TRV entity state change."""
-                    # Always check and enforce external mode on any select entity update
-                    if event.data.get("entity_id") == device.select_entity_id:
-                        select_state = event.data.get("new_state")
-                        if select_state and select_state.state != "external":
-                            try:
-                                _LOGGER.info(
-                                    "Setting %s to external mode (was: %s)",
-                                    device.device_name,
-                                    select_state.state,
-                                )
-                                await self.hass.services.async_call(
-                                    "select",
-                                    "select_option",
-                                    {
-                                        "entity_id": device.select_entity_id,
-                                        "option": "external",
-                                    },
-                                    blocking=True,
-                                )
-                            except Exception as e:
-                                _LOGGER.error(
-                                    "Failed to set external mode for %s: %s",
-                                    device.device_name,
-                                    e,
-                                )
-                    
-                    _LOGGER.debug(
-                        "TRV entity state changed for %s, triggering sync check",
-                        device.device_name,
-                    )
-                    await self._async_sync_device(device)
+            # The area sensor triggers a sync of every TRV in the area
+            self.entity_devices.setdefault(device.temp_sensor_id, []).append(device)
 
-                return _async_trv_state_changed
+            _LOGGER.info(
+                "Setup listener for TRV %s monitoring entities: %s",
+                device.device_name,
+                ", ".join([*entity_ids, device.temp_sensor_id]),
+            )
 
-            listener = async_track_state_change_event(
+        if self.entity_devices:
+            self.state_unsub = async_track_state_change_event(
                 self.hass,
-                entity_ids,
-                _make_listener(device),
+                list(self.entity_devices),
+                self._async_entity_state_changed,
+                job_type=HassJobType.Callback,
             )
 
-            self.area_listeners[device.device_id] = listener
+    @callback
+    def _async_entity_state_changed(self, event: Event) -> None:
+        """Route a state change to the TRV devices depending on the entity."""
+        entity_id = event.data["entity_id"]
+        devices = self.entity_devices.get(entity_id)
+        if not devices:
+            return
 
-            _LOGGER.info(
-                "Setup listener for TRV %s monitoring entities: %s",
-                device.device_name,
-                ", ".join(entity_ids),
+        new_state: State | None = event.data.get("new_state")
+        if entity_id == devices[0].temp_sensor_id:
+            if new_state is None or new_state.state in _NO_VALUE_STATES:
+                # Nothing to push until the area sensor reports a value again
+                return
+            try:
+                temperature = float(new_state.state)
+            except (ValueError, TypeError):
+                pass
+            else:
+                # Drop bursts of readings that stay within tolerance of the last one
+                previous = self.last_sensor_values.get(entity_id)
+                if (
+                    previous is not None
+                    and abs(previous - temperature) < TEMPERATURE_TOLERANCE
+                ):
+                    return
+                self.last_sensor_values[entity_id] = temperature
+        elif all(
+            entity_id == device.number_entity_id
+            and _matches_written(device, new_state)
+            for device in devices
+        ):
+            # Echo of our own set_value, the TRV already has the value we sent
+            return
+
+        _LOGGER.debug(
+            "State of %s changed, triggering sync check for %d TRV devices",
+            entity_id,
+            len(devices),
+        )
+        self._async_create_task(
+            self._async_handle_state_change(entity_id, new_state, devices),
+            name="climate_sync_fanout",
+            eager_start=True,
+        )
+
+    async def _async_handle_state_change(
+        self, entity_id: str, new_state: State | None, devices: list[TRVZBDevice]
+    ) -> None:
+        """Enforce external mode if needed and sync the affected TRV devices."""
+        for device in devices:
+            # The TRV value may no longer match our last write, re-read it on sync
+            if entity_id == device.number_entity_id and not _matches_written(
+                device, new_state
+            ):
+                device.last_written = None
+
+            # Always check and enforce external mode on any select entity update
+            if (
+                entity_id == device.select_entity_id
+                and new_state
+                and new_state.state != "external"
+            ):
+                await self._async_set_external_mode(device, new_state.state)
+
+        self._async_schedule_sync(devices)
+
+    @callback
+    def _async_schedule_sync(self, devices: Iterable[TRVZBDevice]) -> None:
+        """Queue devices for a sync that coalesces bursts of state changes."""
+        self.pending_sync.update(device.device_id for device in devices)
+        if self.pending_sync_handle is None:
+            self.pending_sync_handle = self.hass.loop.call_later(
+                SYNC_DEBOUNCE, self._async_flush_pending_sync
             )
 
+    @callback
+    def _async_flush_pending_sync(self) -> None:
+        """Sync every device queued since the debounce window opened."""
+        self.pending_sync_handle = None
+        # Look devices up now, rediscovery may have replaced or removed them
+        devices = [
+            self.devices[device_id]
+            for device_id in self.pending_sync
+            if device_id in self.devices
+        ]
+        self.pending_sync.clear()
+        if devices:
+            self._async_create_task(
+                self._async_sync_devices(devices), eager_start=True
+            )
+
+    @callback
+    def _async_remove_listeners(self) -> None:
+        """Remove the state change listener."""
+        if self.state_unsub:
+            self.state_unsub()
+            self.state_unsub = None
+        self.entity_devices.clear()
+
+    async def _async_sync_devices(self, devices: Iterable[TRVZBDevice]) -> None:
+        """Sync several TRVZB devices concurrently."""
+        # Service calls to different TRVs are independent, run them concurrently
+        await asyncio.gather(*(self._async_sync_device(device) for device in devices))
+
     async def _async_sync_device(self, device: TRVZBDevice) -> None:
         """Sync temperature to a single TRVZB device."""
-        try:
-            # Get area temperature sensor
-            area_registry = ar.async_get(self.hass)
-            area = area_registry.async_get_area(device.area_id)
-            if not area or not hasattr(area, 'temperature_entity_id') or not area.temperature_entity_id:
+        if device.backoff_until is not None:
+            if self.hass.loop.time() < device.backoff_until:
                 _LOGGER.debug(
-                    "Area for device %s has no temperature sensor",
+                    "%s is backing off after repeated timeouts, skipping sync",
                     device.device_name,
                 )
                 return
+            device.backoff_until = None
 
+        if device.device_id in self.syncing:
+            _LOGGER.debug("%s is already syncing, skipping sync", device.device_name)
+            return
+        self.syncing.add(device.device_id)
+
+        try:
             # Get target temperature from area sensor
-            temp_state = self.hass.states.get(area.temperature_entity_id)
-            if not temp_state or temp_state.state in ("unknown", "unavailable"):
+            temp_state = self.hass.states.get(device.temp_sensor_id)
+            temp_value = temp_state.state if temp_state else STATE_UNKNOWN
+            if temp_value in _NO_VALUE_STATES:
                 _LOGGER.debug(
                     "Area temperature for %s is %s, skipping sync",
                     device.device_name,
-                    temp_state.state if temp_state else "unknown",
+                    temp_value,
                 )
                 return
 
             try:
-                target_temperature = float(temp_state.state)
-            except (ValueError, TypeError) as e:
+                target_temperature = float(temp_value)
+            except (ValueError, TypeError):
                 _LOGGER.warning(
                     "Invalid area temperature value for %s: %s",
                     device.device_name,
-                    temp_state.state,
-                )
-                return
-
-            # Get current external temperature input value from TRV
-            current_state = self.hass.states.get(device.number_entity_id)
-            if not current_state:
-                _LOGGER.warning(
-                    "Cannot get state for %s", device.number_entity_id
+                    temp_value,
                 )
                 return
 
-            # Check tolerance
-            current_temp = None
-            should_sync = False
-            
-            if current_state.state in ("unknown", "unavailable"):
-                # TRV value is unknown/unavailable - we should sync
-                _LOGGER.info(
-                    "Current temperature for %s is %s, will sync to %.1f°C",
-                    device.device_name,
-                    current_state.state,
-                    target_temperature,
+            if device.last_written is not None:
+                # Our last write is still current unless the number entity changed
+                # since, so the TRV state does not need to be read back
+                current_temp = device.last_written
+                should_sync = (
+                    abs(current_temp - target_temperature) >= TEMPERATURE_TOLERANCE
                 )
-                should_sync = True
+                if not should_sync:
+                    device.last_sync_monotonic = self.hass.loop.time()
             else:
-                try:
-                    current_temp = float(current_state.state)
-                    # Check if difference exceeds tolerance
-                    if abs(current_temp - target_temperature) >= TEMPERATURE_TOLERANCE:
-                        should_sync = True
-                    else:
-                        _LOGGER.debug(
-                            "Temperature for %s within tolerance (%.1f°C vs %.1f°C), skipping",
-                            device.device_name,
-                            current_temp,
-                            target_temperature,
-                        )
-                        device.last_sync = dt_util.utcnow()
-                except (ValueError, TypeError):
-                    # Invalid value in TRV - sync anyway
+                # Get current external temperature input value from TRV
+                current_state = self.hass.states.get(device.number_entity_id)
+                if not current_state:
+                    _LOGGER.warning(
+                        "Cannot get state for %s", device.number_entity_id
+                    )
+                    return
+
+                # Check tolerance
+                current_value = current_state.state
+                current_temp = None
+                should_sync = False
+
+                if current_value in _NO_VALUE_STATES:
+                    # TRV value is unknown/unavailable - we should sync
                     _LOGGER.info(
-                        "Invalid current temperature for %s: %s, will sync to %.1f°C",
+                        "Current temperature for %s is %s, will sync to %.1f°C",
                         device.device_name,
-                        current_state.state,
+                        current_value,
                         target_temperature,
                     )
                     should_sync = True
-            
+                else:
+                    try:
+                        current_temp = float(current_value)
+                        # Check if difference exceeds tolerance
+                        if abs(current_temp - target_temperature) >= TEMPERATURE_TOLERANCE:
+                            should_sync = True
+                        else:
+                            _LOGGER.debug(
+                                "Temperature for %s within tolerance (%.1f°C vs %.1f°C), skipping",
+                                device.device_name,
+                                current_temp,
+                                target_temperature,
+                            )
+                            device.last_sync_monotonic = self.hass.loop.time()
+                    except (ValueError, TypeError):
+                        # Invalid value in TRV - sync anyway
+                        _LOGGER.info(
+                            "Invalid current temperature for %s: %s, will sync to %.1f°C",
+                            device.device_name,
+                            current_value,
+                            target_temperature,
+                        )
+                        should_sync = True
+
             if not should_sync:
                 return
 
@@ -354,21 +656,48 @@ class ClimateSync:
                 _LOGGER.info(
                     "Syncing %s: %s -> %.1f°C",
                     device.device_name,
-                    current_state.state,
+                    current_value,
                     target_temperature,
                 )
 
-            await self.hass.services.async_call(
-                "number",
-                "set_value",
-                {
-                    "entity_id": device.number_entity_id,
-                    "value": target_temperature,
-                },
-                blocking=True,
-            )
+            try:
+                # Stop waiting on a slow TRV but let the write itself complete
+                async with asyncio.timeout(SERVICE_CALL_TIMEOUT):
+                    await asyncio.shield(
+                        self.hass.services.async_call(
+                            "number",
+                            "set_value",
+                            {
+                                "entity_id": device.number_entity_id,
+                                "value": target_temperature,
+                            },
+                            blocking=True,
+                        )
+                    )
+            except TimeoutError:
+                device.timeouts += 1
+                if device.timeouts >= MAX_CONSECUTIVE_TIMEOUTS:
+                    device.timeouts = 0
+                    device.backoff_until = (
+                        self.hass.loop.time() + SYNC_INTERVAL.total_seconds()
+                    )
+                    _LOGGER.warning(
+                        "%s did not respond %d times in a row, pausing sync for %s",
+                        device.device_name,
+                        MAX_CONSECUTIVE_TIMEOUTS,
+                        SYNC_INTERVAL,
+                    )
+                else:
+                    _LOGGER.warning(
+                        "Timed out after %ss setting temperature for %s",
+                        SERVICE_CALL_TIMEOUT,
+                        device.device_name,
+                    )
+                return
 
-            device.last_sync = dt_util.utcnow()
+            device.timeouts = 0
+            device.last_written = target_temperature
+            device.last_sync_monotonic = self.hass.loop.time()
 
         except Exception as e:
             _LOGGER.error(
@@ -376,49 +705,102 @@ class ClimateSync:
                 device.device_name,
                 e,
             )
+        finally:
+            self.syncing.discard(device.device_id)
 
     async def _async_periodic_sync(self, now: datetime) -> None:
         """Periodically sync devices that haven't been updated recently."""
+        # Monotonic loop time is immune to wall clock jumps and cheap to compare
+        loop_now = self.hass.loop.time()
+        threshold = SYNC_INTERVAL.total_seconds()
+        due_devices = []
         for device in self.devices.values():
             # Skip if recently synced
-            if device.last_sync and (now - device.last_sync) < SYNC_INTERVAL:
+            last_sync = device.last_sync_monotonic
+            if last_sync is not None and loop_now - last_sync < threshold:
                 continue
 
             _LOGGER.debug(
-                "Periodic sync for %s (last sync: %s)",
+                "Periodic sync for %s (seconds since last sync: %s)",
                 device.device_name,
-                device.last_sync,
+                None if last_sync is None else round(loop_now - last_sync),
             )
-            await self._async_sync_device(device)
+            due_devices.append(device)
+
+        await self._async_sync_devices(due_devices)
 
     async def async_refresh(self) -> None:
         """Manually refresh all devices."""
         _LOGGER.info("Manual refresh triggered")
+        await self._async_rediscover()
+
+    async def _async_rediscover(self) -> None:
+        """Run full discovery and apply only the differences to the current devices."""
+        previous = dict(self.devices)
         await self.async_discover_devices()
+
+        # Keep sync state of devices whose topology did not change
+        changed: list[TRVZBDevice] = []
+        for device_id, device in self.devices.items():
+            old_device = previous.get(device_id)
+            if old_device == device:
+                self.devices[device_id] = old_device
+            else:
+                changed.append(device)
+        removed = previous.keys() - self.devices.keys()
+
+        # Rebuild the listener only when the set of devices changed
+        if changed or removed:
+            _LOGGER.info(
+                "Topology changed: %d new or changed, %d removed TRVZB devices",
+                len(changed),
+                len(removed),
+            )
+            await self.async_setup_listeners()
+            self._async_save_topology()
+
         await self.async_setup_external_mode()
-        
-        # Remove old listeners
-        for listener in self.area_listeners.values():
-            listener()
-        self.area_listeners.clear()
-        
-        # Setup new listeners
-        await self.async_setup_listeners()
 
-        # Force sync all devices
-        await self._async_periodic_sync(dt_util.utcnow())
+        # Force sync new and changed devices without holding up the service call
+        if changed:
+            self._async_create_task(
+                self._async_sync_devices(changed), eager_start=True
+            )
 
     async def async_unload(self) -> None:
         """Unload the integration."""
         # Remove listeners
-        for listener in self.area_listeners.values():
-            listener()
-        self.area_listeners.clear()
-
-        # Remove timer
+        self._async_remove_listeners()
+        for unsub in self.registry_unsubs:
+            unsub()
+        self.registry_unsubs.clear()
+        if self.started_unsub:
+            self.started_unsub()
+            self.started_unsub = None
+
+        # Remove timers
         if self.timer_unsub:
             self.timer_unsub()
             self.timer_unsub = None
+        if self.pending_sync_handle:
+            self.pending_sync_handle.cancel()
+            self.pending_sync_handle = None
+        self.pending_sync.clear()
+
+        # Stop rediscovery, reconcile and sync runs that would outlive the unload
+        for task in self.background_tasks:
+            task.cancel()
+        self.background_tasks.clear()
+
+
+def _matches_written(device: TRVZBDevice, state: State | None) -> bool:
+    """Return True if a number entity state echoes the device's last write."""
+    if device.last_written is None or state is None:
+        return False
+    try:
+        return abs(float(state.state) - device.last_written) < TEMPERATURE_TOLERANCE
+    except (ValueError, TypeError):
+        return False
 
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
@@ -432,14 +814,19 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 
     hass.services.async_register(DOMAIN, SERVICE_REFRESH, _handle_refresh_service)
 
-    async def _run_on_start(_: object) -> None:
+    @callback
+    def _run_on_start(_: object) -> None:
         """Run setup on Home Assistant start."""
-        await coordinator.async_setup()
-
-    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, _run_on_start)
-
-    # Run shortly after startup in case Home Assistant is already running
-    hass.async_create_task(coordinator.async_setup())
+        coordinator.started_unsub = None
+        coordinator._async_create_task(coordinator.async_setup(), eager_start=True)
+
+    # Registries are complete once Home Assistant has started
+    if hass.is_running:
+        coordinator._async_create_task(coordinator.async_setup(), eager_start=True)
+    else:
+        coordinator.started_unsub = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STARTED, _run_on_start
+        )
 
     return True
 
@@ -449,10 +836,7 @@ async def async_unload_entry(hass: HomeAssistant, entry) -> bool:
     coordinator: ClimateSync = hass.data.get(DOMAIN)
     if coordinator:
         await coordinator.async_unload()
-    
-    tasks = [
-        hass.services.async_remove(domain=DOMAIN, service=SERVICE_REFRESH),
-    ]
-    await asyncio.gather(*tasks, return_exceptions=True)
+
+    hass.services.async_remove(domain=DOMAIN, service=SERVICE_REFRESH)
     return True
 
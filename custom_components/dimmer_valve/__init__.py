@@ -1,16 +1,16 @@
 """Dimmer Valve integration for Home Assistant."""
 from __future__ import annotations
 
-import asyncio
 import logging
-from typing import Any
+from typing import Any, Callable, Iterable
 
 import voluptuous as vol
 
 from homeassistant.const import ATTR_ENTITY_ID, Platform
-from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.core import Event, HomeAssistant, ServiceCall, callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.start import async_at_started
 from homeassistant.helpers.typing import ConfigType
 
 DOMAIN = "dimmer_valve"
@@ -83,26 +83,77 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     # Register service
     hass.services.async_register(DOMAIN, SERVICE_REFRESH, handle_refresh)
 
-    # Hide source light entities after a delay to ensure they are created
-    async def _hide_lights_delayed():
-        await asyncio.sleep(5)
-        await _async_hide_light_entities(hass, domain_config.keys())
-
-    hass.async_create_task(_hide_lights_delayed())
+    # Hide source lights that exist now, the rest as soon as they are registered
+    pending = _async_hide_light_entities(hass, domain_config.keys())
+    if pending:
+        hass.data[DOMAIN]["hide_unsub"] = _async_hide_when_created(hass, pending)
 
     return True
 
 
-async def _async_hide_light_entities(
-    hass: HomeAssistant, entity_ids: list[str]
-) -> None:
-    """Hide the source light entities."""
+@callback
+def _async_hide_when_created(
+    hass: HomeAssistant, entity_ids: set[str]
+) -> Callable[[], None]:
+    """Hide the given light entities once they appear in the entity registry.
+
+    Gives up on the lights still missing once Home Assistant has started.
+    """
+    pending = set(entity_ids)
+    unsubs: list[Callable[[], None]] = []
+
+    @callback
+    def _async_stop() -> None:
+        while unsubs:
+            unsubs.pop()()
+        hass.data[DOMAIN].pop("hide_unsub", None)
+
+    @callback
+    def _registry_updated(event: Event) -> None:
+        if event.data["action"] != "create":
+            return
+        entity_id = event.data["entity_id"]
+        if entity_id not in pending:
+            return
+
+        pending.discard(entity_id)
+        _async_hide_light_entities(hass, (entity_id,))
+        if not pending:
+            _async_stop()
+
+    @callback
+    def _give_up(hass: HomeAssistant) -> None:
+        for entity_id in sorted(pending):
+            _LOGGER.warning(
+                "Light entity %s was not registered by startup, it stays visible",
+                entity_id,
+            )
+        _async_stop()
+
+    unsubs.append(
+        hass.bus.async_listen(er.EVENT_ENTITY_REGISTRY_UPDATED, _registry_updated)
+    )
+    # Runs right away if Home Assistant is already running
+    unsubs.append(async_at_started(hass, _give_up))
+    return _async_stop
+
+
+@callback
+def _async_hide_light_entities(
+    hass: HomeAssistant, entity_ids: Iterable[str]
+) -> set[str]:
+    """Hide the source light entities, return those not registered yet."""
     entity_registry = er.async_get(hass)
+    missing: set[str] = set()
 
     for entity_id in entity_ids:
         entity_entry = entity_registry.async_get(entity_id)
         if entity_entry is None:
-            _LOGGER.warning("Light entity %s not found in registry", entity_id)
+            _LOGGER.debug(
+                "Light entity %s not registered yet, will hide it once created",
+                entity_id,
+            )
+            missing.add(entity_id)
             continue
 
         # Skip if already hidden
@@ -116,12 +167,15 @@ async def _async_hide_light_entities(
         )
         _LOGGER.info("Hidden light entity %s", entity_id)
 
+    return missing
+
 
 async def async_unload_entry(hass: HomeAssistant, entry) -> bool:
     """Handle unloading the integration."""
-    tasks = [
-        hass.services.async_remove(domain=DOMAIN, service=SERVICE_REFRESH),
-    ]
-    await asyncio.gather(*tasks, return_exceptions=True)
+    hide_unsub = hass.data.get(DOMAIN, {}).pop("hide_unsub", None)
+    if hide_unsub:
+        hide_unsub()
+
+    hass.services.async_remove(domain=DOMAIN, service=SERVICE_REFRESH)
     return True
 
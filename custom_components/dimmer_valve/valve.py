@@ -1,6 +1,7 @@
 """Valve platform for Dimmer Valve integration."""
 from __future__ import annotations
 
+import functools
 import logging
 from typing import Any
 
@@ -12,7 +13,7 @@ from homeassistant.const import (
     STATE_UNAVAILABLE,
     STATE_UNKNOWN,
 )
-from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.core import Event, HomeAssistant, State, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.restore_state import RestoreEntity
@@ -22,6 +23,35 @@ from . import DOMAIN, VALVE_TYPE_NORMALLY_CLOSED, VALVE_TYPE_NORMALLY_OPEN
 
 _LOGGER = logging.getLogger(__name__)
 
+# States in which the dimmer or a restored valve carries no usable value
+_UNAVAILABLE_STATES = frozenset({STATE_UNKNOWN, STATE_UNAVAILABLE})
+
+
+@functools.lru_cache(maxsize=None)
+def _conversion_tables(
+    valve_type: str,
+) -> tuple[tuple[int, ...], tuple[int, ...]]:
+    """Return brightness->position and position->brightness tables for a valve type."""
+    normally_open = valve_type == VALVE_TYPE_NORMALLY_OPEN
+
+    # Convert brightness from 0-255 to 0-100
+    # NO: 100% brightness = 0% valve position (closed)
+    # NC: 100% brightness = 100% valve position (open)
+    brightness_to_position = tuple(
+        100 - int((brightness / 255) * 100)
+        if normally_open
+        else int((brightness / 255) * 100)
+        for brightness in range(256)
+    )
+
+    # Convert from 0-100 to 0-255
+    position_to_brightness = tuple(
+        int((((100 - position) if normally_open else position) / 100) * 255)
+        for position in range(101)
+    )
+
+    return brightness_to_position, position_to_brightness
+
 
 async def async_setup_platform(
     hass: HomeAssistant,
@@ -37,7 +67,7 @@ async def async_setup_platform(
     for dimmer_entity_id, valve_type in discovery_info.items():
         # Create valve entity_id from dimmer entity_id
         # light.mast_valve_l1 -> valve.mast_valve_l1
-        valve_entity_id = dimmer_entity_id.replace("light.", "valve.", 1)
+        valve_entity_id = f"valve.{dimmer_entity_id.partition('.')[2]}"
 
         entity = DimmerValve(
             hass=hass,
@@ -53,7 +83,8 @@ async def async_setup_platform(
             valve_type,
         )
 
-    async_add_entities(entities, True)
+    # State comes from the dimmer in async_added_to_hass, there is nothing to poll
+    async_add_entities(entities)
 
 
 class DimmerValve(ValveEntity, RestoreEntity):
@@ -78,15 +109,17 @@ class DimmerValve(ValveEntity, RestoreEntity):
         self.hass = hass
         self._dimmer_entity_id = dimmer_entity_id
         self._valve_type = valve_type
+        # Valves of the same type share one pair of tables
+        self._to_position, self._to_brightness = _conversion_tables(valve_type)
         self._attr_unique_id = f"dimmer_valve_{dimmer_entity_id}"
-        self._attr_name = valve_entity_id.replace("valve.", "").replace("_", " ").title()
+        self._attr_name = valve_entity_id.partition(".")[2].replace("_", " ").title()
         self.entity_id = valve_entity_id
 
         # Internal state
         self._current_position: int | None = None
         self._is_closed: bool | None = None
         self._dimmer_listener = None
-        self._updating_from_dimmer = False
+        # Set while a light service call is in flight, to ignore its echo
         self._updating_from_valve = False
 
         _LOGGER.debug(
@@ -100,41 +133,49 @@ class DimmerValve(ValveEntity, RestoreEntity):
         """Run when entity about to be added to hass."""
         await super().async_added_to_hass()
 
-        # Restore previous state
-        last_state = await self.async_get_last_state()
-        if last_state is not None and last_state.state not in (
-            STATE_UNKNOWN,
-            STATE_UNAVAILABLE,
-        ):
-            self._is_closed = last_state.state == "closed"
-            if last_state.attributes.get("current_position") is not None:
-                self._current_position = int(last_state.attributes["current_position"])
-            _LOGGER.debug(
-                "Restored state for %s: closed=%s, position=%s",
-                self.entity_id,
-                self._is_closed,
-                self._current_position,
-            )
+        dimmer_state = self.hass.states.get(self._dimmer_entity_id)
+
+        # Restore previous state only while the dimmer cannot provide it
+        if dimmer_state is None or dimmer_state.state in _UNAVAILABLE_STATES:
+            await self._async_restore_state()
+            # The dimmer may have come up while the restore data was loading
+            dimmer_state = self.hass.states.get(self._dimmer_entity_id)
 
         # Get initial state from dimmer
-        await self._async_update_from_dimmer()
+        self._update_from_dimmer(dimmer_state)
 
         # Setup listener for dimmer state changes
-        @callback
-        def _async_dimmer_changed(event: Event) -> None:
-            """Handle dimmer state change."""
-            new_state = event.data.get("new_state")
-            if new_state is None:
-                return
-
-            self.hass.async_create_task(self._async_update_from_dimmer())
-
         self._dimmer_listener = async_track_state_change_event(
-            self.hass, [self._dimmer_entity_id], _async_dimmer_changed
+            self.hass, [self._dimmer_entity_id], self._async_dimmer_changed
         )
 
         _LOGGER.debug("Setup state listener for dimmer %s", self._dimmer_entity_id)
 
+    async def _async_restore_state(self) -> None:
+        """Restore position and closed state from before the restart."""
+        last_state = await self.async_get_last_state()
+        if last_state is None or last_state.state in _UNAVAILABLE_STATES:
+            return
+
+        self._is_closed = last_state.state == "closed"
+        if last_state.attributes.get("current_position") is not None:
+            self._current_position = int(last_state.attributes["current_position"])
+        _LOGGER.debug(
+            "Restored state for %s: closed=%s, position=%s",
+            self.entity_id,
+            self._is_closed,
+            self._current_position,
+        )
+
+    @callback
+    def _async_dimmer_changed(self, event: Event) -> None:
+        """Handle dimmer state change."""
+        new_state = event.data.get("new_state")
+        if new_state is None:
+            return
+
+        self._update_from_dimmer(new_state)
+
     async def async_will_remove_from_hass(self) -> None:
         """Run when entity will be removed from hass."""
         if self._dimmer_listener:
@@ -163,86 +204,69 @@ class DimmerValve(ValveEntity, RestoreEntity):
 
     def _dimmer_brightness_to_valve_position(self, brightness: int) -> int:
         """Convert dimmer brightness (0-255) to valve position (0-100)."""
-        # Convert brightness from 0-255 to 0-100
-        brightness_percent = int((brightness / 255) * 100)
-
-        # Apply valve type transformation
-        if self._valve_type == VALVE_TYPE_NORMALLY_OPEN:
-            # NO: 100% brightness = 0% valve position (closed)
-            return 100 - brightness_percent
-        else:
-            # NC: 100% brightness = 100% valve position (open)
-            return brightness_percent
+        # Clamp first: the tables only cover whole values in range
+        return self._to_position[max(0, min(255, int(brightness)))]
 
     def _valve_position_to_dimmer_brightness(self, position: int) -> int:
         """Convert valve position (0-100) to dimmer brightness (0-255)."""
-        # Apply valve type transformation
-        if self._valve_type == VALVE_TYPE_NORMALLY_OPEN:
-            # NO: 0% valve position = 100% brightness (closed)
-            brightness_percent = 100 - position
-        else:
-            # NC: 100% valve position = 100% brightness (open)
-            brightness_percent = position
-
-        # Convert from 0-100 to 0-255
-        return int((brightness_percent / 100) * 255)
-
-    async def _async_update_from_dimmer(self) -> None:
+        return self._to_brightness[max(0, min(100, int(position)))]
+
+    @callback
+    def _update_from_dimmer(self, dimmer_state: State | None) -> None:
         """Update valve state from dimmer state."""
         if self._updating_from_valve:
             _LOGGER.debug("Skipping update from dimmer (currently updating from valve)")
             return
 
-        self._updating_from_dimmer = True
-        try:
-            dimmer_state = self.hass.states.get(self._dimmer_entity_id)
-            if dimmer_state is None:
-                _LOGGER.warning("Dimmer entity %s not found", self._dimmer_entity_id)
-                return
-
-            if dimmer_state.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
-                _LOGGER.debug("Dimmer %s is unavailable", self._dimmer_entity_id)
-                return
-
-            # Get brightness from dimmer
-            brightness = dimmer_state.attributes.get("brightness", 0)
-            if dimmer_state.state == "off":
-                brightness = 0
-
-            # Convert to valve position
-            new_position = self._dimmer_brightness_to_valve_position(brightness)
-            old_position = self._current_position
-
-            if new_position != old_position:
-                self._current_position = new_position
-                self._is_closed = new_position == 0
-                self.async_write_ha_state()
-                _LOGGER.debug(
-                    "Updated %s from dimmer: brightness=%d -> position=%d%%",
-                    self.entity_id,
-                    brightness,
-                    new_position,
-                )
-        finally:
-            self._updating_from_dimmer = False
+        if dimmer_state is None:
+            _LOGGER.warning("Dimmer entity %s not found", self._dimmer_entity_id)
+            return
 
-    async def _async_update_dimmer(self, target_position: int) -> None:
-        """Update dimmer brightness from valve position."""
-        if self._updating_from_dimmer:
-            _LOGGER.debug("Skipping update to dimmer (currently updating from dimmer)")
+        if dimmer_state.state in _UNAVAILABLE_STATES:
+            _LOGGER.debug("Dimmer %s is unavailable", self._dimmer_entity_id)
             return
 
-        self._updating_from_valve = True
-        try:
-            brightness = self._valve_position_to_dimmer_brightness(target_position)
+        # Get brightness from dimmer, lights that are on may report None
+        brightness = dimmer_state.attributes.get("brightness") or 0
+        if dimmer_state.state == "off":
+            brightness = 0
+
+        # Convert to valve position
+        new_position = self._dimmer_brightness_to_valve_position(brightness)
+        new_closed = new_position == 0
 
+        # Brightness steps that round to the same position change nothing visible
+        if (
+            new_position != self._current_position
+            or new_closed != self._is_closed
+        ):
+            self._current_position = new_position
+            self._is_closed = new_closed
+            self.async_write_ha_state()
             _LOGGER.debug(
-                "Updating dimmer %s: position=%d%% -> brightness=%d",
-                self._dimmer_entity_id,
-                target_position,
+                "Updated %s from dimmer: brightness=%d -> position=%d%%",
+                self.entity_id,
                 brightness,
+                new_position,
             )
 
+    async def _async_update_dimmer(self, target_position: int) -> None:
+        """Update dimmer brightness from valve position."""
+        brightness = self._valve_position_to_dimmer_brightness(target_position)
+
+        _LOGGER.debug(
+            "Updating dimmer %s: position=%d%% -> brightness=%d",
+            self._dimmer_entity_id,
+            target_position,
+            brightness,
+        )
+
+        # Show the requested position right away instead of after the light call
+        previous = (self._current_position, self._is_closed)
+        self._async_set_position(target_position)
+
+        self._updating_from_valve = True
+        try:
             # Turn on/off or set brightness
             if brightness == 0:
                 await self.hass.services.async_call(
@@ -261,14 +285,23 @@ class DimmerValve(ValveEntity, RestoreEntity):
                     },
                     blocking=True,
                 )
-
-            # Update internal state
-            self._current_position = target_position
-            self._is_closed = target_position == 0
+        except Exception:
+            # The dimmer kept its brightness, so go back to the position it reflects
+            self._current_position, self._is_closed = previous
             self.async_write_ha_state()
+            raise
         finally:
             self._updating_from_valve = False
 
+    @callback
+    def _async_set_position(self, position: int) -> None:
+        """Set the valve position, writing state only if it changed."""
+        closed = position == 0
+        if position != self._current_position or closed != self._is_closed:
+            self._current_position = position
+            self._is_closed = closed
+            self.async_write_ha_state()
+
     async def async_open_valve(self, **kwargs: Any) -> None:
         """Open the valve."""
         _LOGGER.debug("Opening valve %s", self.entity_id)
@@ -3,10 +3,12 @@
 import json
 from pathlib import Path
 
+from setup_registries import write_registry
+
 storage_path = Path("/home/alex/Projects/ha_filters/tests/ha_config/.storage")
 area_file = storage_path / "core.area_registry"
 
-with open(area_file, 'r') as f:
+with open(area_file, 'r', encoding='utf-8') as f:
     data = json.load(f)
 
 # Add aliases to areas
@@ -22,8 +24,7 @@ for area in data['data']['areas']:
         area['aliases'] = alias_map[area['name']]
         print(f"✓ Added aliases to {area['name']}: {area['aliases']}")
 
-with open(area_file, 'w') as f:
-    json.dump(data, f, indent=2)
+write_registry(area_file, data)
 
 print("\n✅ Aliases added successfully!")
 
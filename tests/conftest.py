@@ -0,0 +1,161 @@
+"""Shared fixtures for the Home Assistant test suite."""
+from __future__ import annotations
+
+import functools
+import importlib.util
+import shutil
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+
+import pytest
+
+DOCKER_COMPOSE_FILE = Path(__file__).parent / "docker-compose.yml"
+CONTAINER_NAME = "ha_test"
+# Logged by Home Assistant core once startup has completed
+STARTED_SENTINEL = "Home Assistant initialized in"
+
+# Make custom_components importable from every test module
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+
+def _install_homeassistant_stubs() -> None:
+    """Register minimal Home Assistant modules for the unit tests."""
+    homeassistant = types.ModuleType("homeassistant")
+    core = types.ModuleType("homeassistant.core")
+    helpers = types.ModuleType("homeassistant.helpers")
+    area_registry = types.ModuleType("homeassistant.helpers.area_registry")
+    device_registry = types.ModuleType("homeassistant.helpers.device_registry")
+    entity_registry = types.ModuleType("homeassistant.helpers.entity_registry")
+    start = types.ModuleType("homeassistant.helpers.start")
+    util = types.ModuleType("homeassistant.util")
+
+    class HomeAssistant:
+        pass
+
+    def slugify(value: str) -> str:
+        return value.lower().replace(" ", "_")
+
+    core.HomeAssistant = HomeAssistant
+    core.ServiceCall = object
+    core.callback = lambda func: func
+    # Only imported, the unit tests never call async_setup
+    start.async_at_started = None
+    util.slugify = slugify
+    helpers.area_registry = area_registry
+    helpers.device_registry = device_registry
+    helpers.entity_registry = entity_registry
+    helpers.start = start
+    homeassistant.core = core
+    homeassistant.helpers = helpers
+    homeassistant.util = util
+
+    for module in (
+        homeassistant,
+        core,
+        helpers,
+        area_registry,
+        device_registry,
+        entity_registry,
+        start,
+        util,
+    ):
+        sys.modules.setdefault(module.__name__, module)
+
+
+# Stub Home Assistant once per session, and only where it is not installed,
+# so the e2e tests keep importing the real package
+if importlib.util.find_spec("homeassistant") is None:
+    _install_homeassistant_stubs()
+
+
+def pytest_configure(config):
+    """Register the markers used by this suite."""
+    config.addinivalue_line(
+        "markers", "docker: test needs a running Docker daemon"
+    )
+
+
+@functools.cache
+def _docker_available() -> bool:
+    """Return True if the docker CLI is installed and its daemon answers."""
+    if shutil.which("docker") is None:
+        return False
+    try:
+        result = subprocess.run(
+            ["docker", "info"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=2,
+        )
+    except subprocess.TimeoutExpired:
+        return False
+    return result.returncode == 0
+
+
+def _container_running() -> bool:
+    """Return True if the test container is already up."""
+    result = subprocess.run(
+        ["docker", "inspect", "-f", "{{.State.Running}}", CONTAINER_NAME],
+        capture_output=True,
+        text=True,
+    )
+    return result.returncode == 0 and result.stdout.strip() == "true"
+
+
+def _logged(needle: str) -> bool:
+    """Return True if the test container's log contains needle."""
+    with subprocess.Popen(
+        ["docker", "logs", CONTAINER_NAME],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    ) as process:
+        try:
+            return any(needle in line for line in process.stdout)
+        finally:
+            process.kill()
+
+
+def _wait_until_started(timeout: float = 300, interval: float = 0.5) -> None:
+    """Wait for Home Assistant to log that startup completed."""
+    deadline = time.monotonic() + timeout
+    while not _logged(STARTED_SENTINEL):
+        if time.monotonic() >= deadline:
+            pytest.fail(f"Home Assistant did not finish starting within {timeout}s")
+        time.sleep(interval)
+
+
+def _compose(*args: str, check: bool = False) -> None:
+    """Run a docker compose command against the test stack."""
+    subprocess.run(
+        ["docker", "compose", "-f", str(DOCKER_COMPOSE_FILE), *args],
+        check=check,
+        cwd=DOCKER_COMPOSE_FILE.parent,
+    )
+
+
+@pytest.fixture(scope="session")
+def ha_container():
+    """Start the Home Assistant container once and share it across the session.
+
+    Yields only after Home Assistant has finished starting.
+    """
+    if not _docker_available():
+        pytest.skip("docker not available")
+    if _container_running():
+        # Reuse a stack that is already up and leave it running for the next run
+        _wait_until_started()
+        yield CONTAINER_NAME
+        return
+    _compose("up", "-d", check=True)
+    try:
+        # The log needs no API token, unlike the REST state endpoints
+        _wait_until_started()
+        yield CONTAINER_NAME
+    finally:
+        _compose("down", "-v")
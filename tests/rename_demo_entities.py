@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 """Rename demo entities to match area prefixes."""
 import json
+from itertools import islice
 from pathlib import Path
 
+from setup_registries import write_registry
+
 storage_path = Path("/home/alex/Projects/ha_filters/tests/ha_config/.storage")
 device_file = storage_path / "core.device_registry"
 entity_file = storage_path / "core.entity_registry"
@@ -14,8 +17,18 @@ with open(device_file, 'r') as f:
 with open(entity_file, 'r') as f:
     entities = json.load(f)
 
-# Find devices without area_id
-unassigned_devices = [d for d in devices['data']['devices'] if d.get('area_id') is None and d.get('name') not in ['Backup', 'Sun']][:4]
+# Find the first 4 devices without area_id
+skipped_names = {'Backup', 'Sun'}
+unassigned_devices = list(islice(
+    (d for d in devices['data']['devices']
+     if d.get('area_id') is None and d.get('name') not in skipped_names),
+    4,
+))
+
+# Group entities by device once instead of scanning them per device
+entities_by_device = {}
+for e in entities['data']['entities']:
+    entities_by_device.setdefault(e.get('device_id'), []).append(e)
 
 print(f"Found {len(unassigned_devices)} unassigned devices\n")
 
@@ -40,7 +53,7 @@ for idx, device in enumerate(unassigned_devices[:4]):
     print(f"Device: {device_name} (ID: {device_id})")
     
     # Find entities for this device
-    device_entities = [e for e in entities['data']['entities'] if e.get('device_id') == device_id]
+    device_entities = entities_by_device.get(device_id, [])
     
     for entity in device_entities:
         old_entity_id = entity['entity_id']
@@ -54,8 +67,7 @@ for idx, device in enumerate(unassigned_devices[:4]):
     print()
 
 # Write back
-with open(entity_file, 'w') as f:
-    json.dump(entities, f, indent=2)
+write_registry(entity_file, entities)
 
 print(f"\n✅ Renamed {renamed_count} entities!")
 print("Expected behavior after HA restart:")
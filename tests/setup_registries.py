@@ -1,21 +1,39 @@
 #!/usr/bin/env python3
 """Script to populate HA registries with test data."""
+import base64
 import json
 import os
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from pathlib import Path
 
 
 def generate_id():
-    """Generate a simple ID."""
-    import random
-    import string
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=26))
+    """Generate a 26 character uppercase ID from 128 random bits."""
+    return base64.b32encode(os.urandom(16)).decode('ascii').rstrip('=')
 
 
-def get_timestamp():
-    """Get current timestamp in ISO format."""
-    return datetime.now(timezone.utc).isoformat()
+# All rows created in one run share the setup time
+SETUP_TIMESTAMP = datetime.now(timezone.utc).isoformat()
+
+
+def write_registry(path, data):
+    """Atomically write a registry file, keeping non-ASCII aliases unescaped."""
+    # Write next to the target and rename, so an interrupted run never leaves
+    # Home Assistant with a truncated registry
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+@contextmanager
+def registry_file(path):
+    """Load a registry file once and write it back once on exit."""
+    with open(path, 'r', encoding='utf-8') as f:
+        registry = json.load(f)
+    yield registry
+    write_registry(path, registry)
 
 
 def create_area_registry(storage_path):
@@ -28,45 +46,45 @@ def create_area_registry(storage_path):
             "areas": [
                 {
                     "aliases": ["kitchen", "кухня"],
-                    "created_at": get_timestamp(),
+                    "created_at": SETUP_TIMESTAMP,
                     "floor_id": None,
                     "icon": None,
                     "id": generate_id(),
                     "labels": [],
-                    "modified_at": get_timestamp(),
+                    "modified_at": SETUP_TIMESTAMP,
                     "name": "Kitchen",
                     "picture": None
                 },
                 {
                     "aliases": ["living_room", "гостиная"],
-                    "created_at": get_timestamp(),
+                    "created_at": SETUP_TIMESTAMP,
                     "floor_id": None,
                     "icon": None,
                     "id": generate_id(),
                     "labels": [],
-                    "modified_at": get_timestamp(),
+                    "modified_at": SETUP_TIMESTAMP,
                     "name": "Living Room",
                     "picture": None
                 },
                 {
                     "aliases": ["bedroom", "спальня"],
-                    "created_at": get_timestamp(),
+                    "created_at": SETUP_TIMESTAMP,
                     "floor_id": None,
                     "icon": None,
                     "id": generate_id(),
                     "labels": [],
-                    "modified_at": get_timestamp(),
+                    "modified_at": SETUP_TIMESTAMP,
                     "name": "Bedroom",
                     "picture": None
                 },
                 {
                     "aliases": ["bathroom", "ванная"],
-                    "created_at": get_timestamp(),
+                    "created_at": SETUP_TIMESTAMP,
                     "floor_id": None,
                     "icon": None,
                     "id": generate_id(),
                     "labels": [],
-                    "modified_at": get_timestamp(),
+                    "modified_at": SETUP_TIMESTAMP,
                     "name": "Bathroom",
                     "picture": None
                 }
@@ -74,9 +92,7 @@ def create_area_registry(storage_path):
         }
     }
     
-    area_file = storage_path / "core.area_registry"
-    with open(area_file, 'w') as f:
-        json.dump(areas_data, f, indent=2)
+    write_registry(storage_path / "core.area_registry", areas_data)
     print(f"✓ Created area registry with {len(areas_data['data']['areas'])} areas")
     return areas_data['data']['areas']
 
@@ -85,10 +101,6 @@ def update_device_registry(storage_path):
     """Update device registry with test devices."""
     device_file = storage_path / "core.device_registry"
     
-    # Read existing registry
-    with open(device_file, 'r') as f:
-        registry = json.load(f)
-    
     # Create test devices
     test_devices = [
         {
@@ -97,7 +109,7 @@ def update_device_registry(storage_path):
             "config_entries_subentries": {"test_integration": [None]},
             "configuration_url": None,
             "connections": [],
-            "created_at": get_timestamp(),
+            "created_at": SETUP_TIMESTAMP,
             "disabled_by": None,
             "entry_type": None,
             "hw_version": None,
@@ -107,7 +119,7 @@ def update_device_registry(storage_path):
             "manufacturer": "Test Corp",
             "model": "Kitchen Sensor Pro",
             "model_id": None,
-            "modified_at": get_timestamp(),
+            "modified_at": SETUP_TIMESTAMP,
             "name_by_user": None,
             "name": "Kitchen Multisensor",
             "primary_config_entry": "test_integration",
@@ -121,7 +133,7 @@ def update_device_registry(storage_path):
             "config_entries_subentries": {"test_integration": [None]},
             "configuration_url": None,
             "connections": [],
-            "created_at": get_timestamp(),
+            "created_at": SETUP_TIMESTAMP,
             "disabled_by": None,
             "entry_type": None,
             "hw_version": None,
@@ -131,7 +143,7 @@ def update_device_registry(storage_path):
             "manufacturer": "Test Corp",
             "model": "Living Room Climate",
             "model_id": None,
-            "modified_at": get_timestamp(),
+            "modified_at": SETUP_TIMESTAMP,
             "name_by_user": None,
             "name": "Living Room Climate Sensor",
             "primary_config_entry": "test_integration",
@@ -145,7 +157,7 @@ def update_device_registry(storage_path):
             "config_entries_subentries": {"test_integration": [None]},
             "configuration_url": None,
             "connections": [],
-            "created_at": get_timestamp(),
+            "created_at": SETUP_TIMESTAMP,
             "disabled_by": None,
             "entry_type": None,
             "hw_version": None,
@@ -155,7 +167,7 @@ def update_device_registry(storage_path):
             "manufacturer": "Test Corp",
             "model": "Bedroom Sensor",
             "model_id": None,
-            "modified_at": get_timestamp(),
+            "modified_at": SETUP_TIMESTAMP,
             "name_by_user": None,
             "name": "Bedroom Temperature Sensor",
             "primary_config_entry": "test_integration",
@@ -169,7 +181,7 @@ def update_device_registry(storage_path):
             "config_entries_subentries": {"test_integration": [None]},
             "configuration_url": None,
             "connections": [],
-            "created_at": get_timestamp(),
+            "created_at": SETUP_TIMESTAMP,
             "disabled_by": None,
             "entry_type": None,
             "hw_version": None,
@@ -179,7 +191,7 @@ def update_device_registry(storage_path):
             "manufacturer": "Test Corp",
             "model": "Random Sensor X",
             "model_id": None,
-            "modified_at": get_timestamp(),
+            "modified_at": SETUP_TIMESTAMP,
             "name_by_user": None,
             "name": "Unassigned Random Sensor",
             "primary_config_entry": "test_integration",
@@ -189,12 +201,9 @@ def update_device_registry(storage_path):
         }
     ]
     
-    # Add test devices
-    registry['data']['devices'].extend(test_devices)
-    
-    # Write back
-    with open(device_file, 'w') as f:
-        json.dump(registry, f, indent=2)
+    # Add test devices to the existing registry
+    with registry_file(device_file) as registry:
+        registry['data']['devices'].extend(test_devices)
     
     print(f"✓ Added {len(test_devices)} test devices to device registry")
     return test_devices
@@ -204,10 +213,6 @@ def update_entity_registry(storage_path, devices):
     """Update entity registry with test entities."""
     entity_file = storage_path / "core.entity_registry"
     
-    # Read existing registry
-    with open(entity_file, 'r') as f:
-        registry = json.load(f)
-    
     # Helper to create entity dict
     def make_entity(device_id, entity_id, name, device_class=None, unit=None):
         return {
@@ -217,7 +222,7 @@ def update_entity_registry(storage_path, devices):
             "capabilities": None,
             "config_entry_id": "test_integration",
             "config_subentry_id": None,
-            "created_at": get_timestamp(),
+            "created_at": SETUP_TIMESTAMP,
             "device_class": None,
             "device_id": device_id,
             "disabled_by": None,
@@ -228,7 +233,7 @@ def update_entity_registry(storage_path, devices):
             "icon": None,
             "id": generate_id(),
             "labels": [],
-            "modified_at": get_timestamp(),
+            "modified_at": SETUP_TIMESTAMP,
             "name": None,
             "options": {},
             "original_device_class": device_class,
@@ -252,12 +257,9 @@ def update_entity_registry(storage_path, devices):
         make_entity(devices[3]['id'], "sensor.random_sensor_data", "Random Sensor Data", None, None),
     ]
     
-    # Add test entities
-    registry['data']['entities'].extend(test_entities)
-    
-    # Write back
-    with open(entity_file, 'w') as f:
-        json.dump(registry, f, indent=2)
+    # Add test entities to the existing registry
+    with registry_file(entity_file) as registry:
+        registry['data']['entities'].extend(test_entities)
     
     print(f"✓ Added {len(test_entities)} test entities to entity registry")
 
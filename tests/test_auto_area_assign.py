@@ -1,72 +1,20 @@
-from pathlib import Path
 import asyncio
-
-import sys
-import types
 from dataclasses import dataclass
 
 import pytest
 
-# Ensure project root on sys.path
-sys.path.append(str(Path(__file__).resolve().parents[1]))
-
-# --- Minimal Home Assistant stubs -------------------------------------------------
-
-homeassistant = types.ModuleType("homeassistant")
-core = types.ModuleType("homeassistant.core")
-const = types.ModuleType("homeassistant.const")
-helpers = types.ModuleType("homeassistant.helpers")
-area_registry = types.ModuleType("homeassistant.helpers.area_registry")
-device_registry = types.ModuleType("homeassistant.helpers.device_registry")
-entity_registry = types.ModuleType("homeassistant.helpers.entity_registry")
-util = types.ModuleType("homeassistant.util")
-
-
-class HomeAssistant:
-    pass
-
-
-def slugify(value: str) -> str:
-    return value.lower().replace(" ", "_")
-
-
-core.HomeAssistant = HomeAssistant
-core.ServiceCall = object
-const.EVENT_HOMEASSISTANT_STARTED = "homeassistant_started"
-util.slugify = slugify
-helpers.area_registry = area_registry
-helpers.device_registry = device_registry
-helpers.entity_registry = entity_registry
-homeassistant.core = core
-homeassistant.const = const
-homeassistant.helpers = helpers
-homeassistant.util = util
-
-area_registry.async_get = lambda hass: None
-device_registry.async_get = lambda hass: None
-entity_registry.async_get = lambda hass: None
-
-sys.modules.setdefault("homeassistant", homeassistant)
-sys.modules.setdefault("homeassistant.core", core)
-sys.modules.setdefault("homeassistant.const", const)
-sys.modules.setdefault("homeassistant.helpers", helpers)
-sys.modules.setdefault("homeassistant.helpers.area_registry", area_registry)
-sys.modules.setdefault("homeassistant.helpers.device_registry", device_registry)
-sys.modules.setdefault("homeassistant.helpers.entity_registry", entity_registry)
-sys.modules.setdefault("homeassistant.util", util)
-
+import custom_components.auto_area_assign as auto_area_assign
+from custom_components.auto_area_assign import _async_assign_areas
 
-from custom_components.auto_area_assign import _async_assign_areas  # noqa: E402
 
-
-@dataclass
+@dataclass(slots=True)
 class AreaEntry:
     id: str
     name: str
     aliases: tuple[str, ...] = ()
 
 
-@dataclass
+@dataclass(slots=True)
 class DeviceEntry:
     id: str
     area_id: str | None = None
@@ -77,7 +25,7 @@ class DeviceEntry:
             self.labels = set()
 
 
-@dataclass
+@dataclass(slots=True)
 class EntityEntry:
     entity_id: str
     object_id: str
@@ -91,6 +39,8 @@ class EntityEntry:
 
 
 class AreaRegistryStub:
+    __slots__ = ("_areas",)
+
     def __init__(self, areas):
         self._areas = areas
 
@@ -99,6 +49,8 @@ class AreaRegistryStub:
 
 
 class DeviceRegistryStub:
+    __slots__ = ("devices", "updated")
+
     def __init__(self, devices):
         self.devices = {device.id: device for device in devices}
         self.updated: list[tuple[str, str]] = []
@@ -113,84 +65,267 @@ class DeviceRegistryStub:
 
 
 class EntityRegistryStub:
+    __slots__ = ("entities", "updated")
+
     def __init__(self, entities):
         self.entities = {entity.entity_id: entity for entity in entities}
         self.updated: list[tuple[str, str]] = []
-    
+
+    def async_get(self, entity_id: str):
+        return self.entities.get(entity_id)
+
     def async_update_entity(self, entity_id: str, *, area_id: str):
         entity = self.entities[entity_id]
         entity.area_id = area_id
         self.updated.append((entity_id, area_id))
 
 
-class HassStub(HomeAssistant):
-    pass
+class HassStub:
+    def __init__(self):
+        self.data = {}
+        self.executor_jobs = 0
+
+    async def async_add_executor_job(self, target, *args):
+        self.executor_jobs += 1
+        return target(*args)
+
+
+@pytest.fixture(scope="module")
+def loop():
+    """Event loop shared by every test in this module."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(autouse=True, scope="module")
+def stub_registries():
+    """Route registry lookups to the stubs attached to the hass stub.
+
+    Patched once for the module so the stubs are used whether or not Home
+    Assistant is installed.
+    """
+    with pytest.MonkeyPatch.context() as patch:
+        # raising=False: the conftest stub modules do not define these
+        patch.setattr(
+            auto_area_assign.ar,
+            "async_get",
+            lambda hass: hass._stub_area_reg,
+            raising=False,
+        )
+        patch.setattr(
+            auto_area_assign.dr,
+            "async_get",
+            lambda hass: hass._stub_device_reg,
+            raising=False,
+        )
+        patch.setattr(
+            auto_area_assign.er,
+            "async_get",
+            lambda hass: hass._stub_entity_reg,
+            raising=False,
+        )
+        patch.setattr(
+            auto_area_assign.dr,
+            "async_entries_for_label",
+            lambda registry, label: [
+                device
+                for device in registry.devices.values()
+                if label in device.labels
+            ],
+            raising=False,
+        )
+        patch.setattr(
+            auto_area_assign.er,
+            "async_entries_for_label",
+            lambda registry, label: [
+                entity
+                for entity in registry.entities.values()
+                if label in entity.labels
+            ],
+            raising=False,
+        )
+        yield
+
+
+def run_assignment(loop, hass, area_reg, device_reg, entity_reg):
+    hass._stub_area_reg = area_reg
+    hass._stub_device_reg = device_reg
+    hass._stub_entity_reg = entity_reg
+    loop.run_until_complete(_async_assign_areas(hass))
+
+
+@pytest.mark.parametrize(
+    ("existing_area", "expected_area", "expected_updated"),
+    [
+        pytest.param(None, "area-1", [("device-1", "area-1")], id="assigns_missing_area"),
+        pytest.param("area-existing", "area-existing", [], id="keeps_existing_area"),
+    ],
+)
+def test_device_area_assignment(loop, existing_area, expected_area, expected_updated):
+    hass = HassStub()
+    area = AreaEntry(id="area-1", name="Kitchen", aliases=("kitchen",))
+    entity = EntityEntry(
+        entity_id="light.kitchen_ceiling",
+        object_id="kitchen_ceiling",
+        device_id="device-1",
+    )
+    device = DeviceEntry(id="device-1", area_id=existing_area)
+
+    area_reg = AreaRegistryStub([area])
+    device_reg = DeviceRegistryStub([device])
+    entity_reg = EntityRegistryStub([entity])
 
+    run_assignment(loop, hass, area_reg, device_reg, entity_reg)
 
-def run_assignment(hass, area_reg, device_reg, entity_reg, monkeypatch):
-    monkeypatch.setattr(area_registry, "async_get", lambda hass: area_reg)
-    monkeypatch.setattr(device_registry, "async_get", lambda hass: device_reg)
-    monkeypatch.setattr(entity_registry, "async_get", lambda hass: entity_reg)
-    asyncio.run(_async_assign_areas(hass))
+    assert device.area_id == expected_area
+    assert device_reg.updated == expected_updated
 
 
-def test_assigns_area_when_device_missing_area(monkeypatch):
+def test_assigns_area_to_entity_without_device(loop):
+    """Test that entity without device gets area assigned directly."""
     hass = HassStub()
-    area = AreaEntry(id="area-1", name="Kitchen", aliases=("kitchen",))
+    area = AreaEntry(id="area-1", name="Hall", aliases=("hall",))
     entity = EntityEntry(
-        entity_id="light.kitchen_ceiling",
-        object_id="kitchen_ceiling",
+        entity_id="light.hall_spot",
+        object_id="hall_spot",
+        device_id=None,
+    )
+
+    area_reg = AreaRegistryStub([area])
+    device_reg = DeviceRegistryStub([])
+    entity_reg = EntityRegistryStub([entity])
+
+    run_assignment(loop, hass, area_reg, device_reg, entity_reg)
+
+    assert device_reg.updated == []
+    assert entity.area_id == "area-1"
+    assert entity_reg.updated == [("light.hall_spot", "area-1")]
+
+
+def test_prefers_longest_matching_alias(loop):
+    """Test that the longest alias prefix wins over a shorter one."""
+    hass = HassStub()
+    living = AreaEntry(id="area-1", name="Living", aliases=("living",))
+    living_room = AreaEntry(id="area-2", name="Living Room", aliases=("living_room",))
+    entity = EntityEntry(
+        entity_id="light.living_room_lamp",
+        object_id="living_room_lamp",
         device_id="device-1",
     )
     device = DeviceEntry(id="device-1", area_id=None)
 
-    area_reg = AreaRegistryStub([area])
+    area_reg = AreaRegistryStub([living, living_room])
     device_reg = DeviceRegistryStub([device])
     entity_reg = EntityRegistryStub([entity])
 
-    run_assignment(hass, area_reg, device_reg, entity_reg, monkeypatch)
+    run_assignment(loop, hass, area_reg, device_reg, entity_reg)
 
-    assert device.area_id == "area-1"
-    assert device_reg.updated == [("device-1", "area-1")]
+    assert device_reg.updated == [("device-1", "area-2")]
 
 
-def test_does_not_override_existing_area(monkeypatch):
+def test_matches_large_registry_in_executor(loop, monkeypatch):
+    """Test that large registries are matched off the event loop."""
+    monkeypatch.setattr(auto_area_assign, "EXECUTOR_MATCH_THRESHOLD", 0)
     hass = HassStub()
-    area = AreaEntry(id="area-1", name="Bedroom", aliases=("bedroom",))
+    area = AreaEntry(id="area-1", name="Kitchen", aliases=("kitchen",))
     entity = EntityEntry(
-        entity_id="light.bedroom_lamp",
-        object_id="bedroom_lamp",
+        entity_id="light.kitchen_ceiling",
+        object_id="kitchen_ceiling",
         device_id="device-1",
     )
-    device = DeviceEntry(id="device-1", area_id="area-existing")
+    device = DeviceEntry(id="device-1", area_id=None)
 
     area_reg = AreaRegistryStub([area])
     device_reg = DeviceRegistryStub([device])
     entity_reg = EntityRegistryStub([entity])
 
-    run_assignment(hass, area_reg, device_reg, entity_reg, monkeypatch)
+    run_assignment(loop, hass, area_reg, device_reg, entity_reg)
 
-    assert device.area_id == "area-existing"
-    assert device_reg.updated == []
+    assert hass.executor_jobs == 1
+    assert device_reg.updated == [("device-1", "area-1")]
 
 
-def test_assigns_area_to_entity_without_device(monkeypatch):
-    """Test that entity without device gets area assigned directly."""
+def test_skips_entity_removed_during_executor_matching(loop, monkeypatch):
+    """Test that entities removed while matching runs are not updated."""
+    monkeypatch.setattr(auto_area_assign, "EXECUTOR_MATCH_THRESHOLD", 0)
     hass = HassStub()
     area = AreaEntry(id="area-1", name="Hall", aliases=("hall",))
-    entity = EntityEntry(
+    removed = EntityEntry(
         entity_id="light.hall_spot",
         object_id="hall_spot",
         device_id=None,
     )
+    kept = EntityEntry(
+        entity_id="light.hall_lamp",
+        object_id="hall_lamp",
+        device_id=None,
+    )
 
     area_reg = AreaRegistryStub([area])
     device_reg = DeviceRegistryStub([])
-    entity_reg = EntityRegistryStub([entity])
+    entity_reg = EntityRegistryStub([removed, kept])
+
+    async def remove_during_job(target, *args):
+        result = target(*args)
+        del entity_reg.entities[removed.entity_id]
+        return result
+
+    hass.async_add_executor_job = remove_during_job
+
+    run_assignment(loop, hass, area_reg, device_reg, entity_reg)
+
+    assert entity_reg.updated == [("light.hall_lamp", "area-1")]
+
+
+def test_ignores_entity_and_device_with_ignore_label(loop):
+    """Test that the auto_area_ignore label excludes entities and devices."""
+    hass = HassStub()
+    area = AreaEntry(id="area-1", name="Garage", aliases=("garage",))
+    ignored_entity = EntityEntry(
+        entity_id="sensor.garage_motion",
+        object_id="garage_motion",
+        device_id=None,
+        labels={"auto_area_ignore"},
+    )
+    entity = EntityEntry(
+        entity_id="light.garage_light",
+        object_id="garage_light",
+        device_id="device-1",
+    )
+    device = DeviceEntry(id="device-1", area_id=None, labels={"auto_area_ignore"})
+
+    area_reg = AreaRegistryStub([area])
+    device_reg = DeviceRegistryStub([device])
+    entity_reg = EntityRegistryStub([ignored_entity, entity])
 
-    run_assignment(hass, area_reg, device_reg, entity_reg, monkeypatch)
+    run_assignment(loop, hass, area_reg, device_reg, entity_reg)
 
     assert device_reg.updated == []
-    assert entity.area_id == "area-1"
-    assert entity_reg.updated == [("light.hall_spot", "area-1")]
+    assert entity_reg.updated == []
+
+
+def test_resolves_shared_device_once(loop):
+    """Test that a device shared by several matching entities is updated once."""
+    hass = HassStub()
+    kitchen = AreaEntry(id="area-1", name="Kitchen", aliases=("kitchen",))
+    hall = AreaEntry(id="area-2", name="Hall", aliases=("hall",))
+    first = EntityEntry(
+        entity_id="light.kitchen_ceiling",
+        object_id="kitchen_ceiling",
+        device_id="device-1",
+    )
+    second = EntityEntry(
+        entity_id="sensor.hall_motion",
+        object_id="hall_motion",
+        device_id="device-1",
+    )
+    device = DeviceEntry(id="device-1", area_id=None)
+
+    area_reg = AreaRegistryStub([kitchen, hall])
+    device_reg = DeviceRegistryStub([device])
+    entity_reg = EntityRegistryStub([first, second])
+
+    run_assignment(loop, hass, area_reg, device_reg, entity_reg)
 
+    assert device_reg.updated == [("device-1", "area-1")]
@@ -1,71 +1,65 @@
 """Basic integration tests for Dimmer Valve component."""
 import subprocess
-import time
-from pathlib import Path
 
+import pytest
 
-def test_component_loads_successfully():
+pytestmark = pytest.mark.docker
+
+# Log lines the component writes during a healthy startup
+EXPECTED_LOGS = (
+    "Setting up dimmer_valve",
+    "Dimmer Valve configuration loaded with 2 dimmers",
+    "Created valve valve.ceiling_lights from dimmer light.ceiling_lights",
+    "Created valve valve.bed_light from dimmer light.bed_light",
+    "Registered new valve.dimmer_valve entity: valve.ceiling_lights",
+    "Registered new valve.dimmer_valve entity: valve.bed_light",
+    "Updated valve.ceiling_lights from dimmer",
+    "Updated valve.bed_light from dimmer",
+    "Hidden light entity light.ceiling_lights",
+    "Hidden light entity light.bed_light",
+)
+COMPONENT_ERROR = "ERROR (MainThread) [custom_components.dimmer_valve]"
+
+
+def scan_logs(container, needles):
+    """Stream the container log once and return the needles that appear in it."""
+    pending = set(needles)
+    found = set()
+    with subprocess.Popen(
+        ["docker", "logs", container],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    ) as process:
+        try:
+            for line in process.stdout:
+                hits = {needle for needle in pending if needle in line}
+                if hits:
+                    pending -= hits
+                    found |= hits
+        finally:
+            process.kill()
+    return found
+
+
+def test_component_loads_successfully(ha_container):
     """Test that the dimmer_valve component loads without errors."""
-    compose_file = Path(__file__).parent / "docker-compose.yml"
-    
-    # Start Home Assistant
-    subprocess.run(
-        ["docker", "compose", "-f", str(compose_file), "up", "-d"],
-        check=True,
-        cwd=compose_file.parent,
-    )
-    
-    # Wait for initialization
-    time.sleep(60)
-    
-    try:
-        # Get logs
-        result = subprocess.run(
-            ["docker", "logs", "ha_test"],
-            capture_output=True,
-            text=True,
-            timeout=10,
-        )
-        
-        logs = result.stdout + result.stderr
-        
-        # Check for successful component setup
-        assert "Setting up dimmer_valve" in logs
-        assert "Dimmer Valve configuration loaded with 2 dimmers" in logs
-        assert "Created valve valve.ceiling_lights from dimmer light.ceiling_lights" in logs
-        assert "Created valve valve.bed_light from dimmer light.bed_light" in logs
-        
-        # Check that entities are registered
-        assert "Registered new valve.dimmer_valve entity: valve.ceiling_lights" in logs
-        assert "Registered new valve.dimmer_valve entity: valve.bed_light" in logs
-        
-        # Check for sync
-        assert "Updated valve.ceiling_lights from dimmer" in logs
-        assert "Updated valve.bed_light from dimmer" in logs
-        
-        # Check that lights are hidden
-        assert "Hidden light entity light.ceiling_lights" in logs
-        assert "Hidden light entity light.bed_light" in logs
-        
-        # Check for no errors
-        assert "ERROR (MainThread) [custom_components.dimmer_valve]" not in logs
-        
-        print("✓ Component loaded successfully")
-        print("✓ Valve entities created")
-        print("✓ Synchronization working")
-        print("✓ Light entities hidden")
-        
-    finally:
-        # Cleanup
-        subprocess.run(
-            ["docker", "compose", "-f", str(compose_file), "down", "-v"],
-            cwd=compose_file.parent,
-        )
+    # ha_container yields only after Home Assistant has finished starting, so
+    # one pass over the log sees everything; the error check needs all of it
+    found = scan_logs(ha_container, (*EXPECTED_LOGS, COMPONENT_ERROR))
 
+    # Check setup, entity registration, sync and hidden lights
+    missing = [needle for needle in EXPECTED_LOGS if needle not in found]
+    assert not missing, f"missing log lines: {missing}"
 
-if __name__ == "__main__":
-    test_component_loads_successfully()
-    print("\n✓ All basic tests passed!")
+    # Check for no errors
+    assert COMPONENT_ERROR not in found
 
+    print("✓ Component loaded successfully")
+    print("✓ Valve entities created")
+    print("✓ Synchronization working")
+    print("✓ Light entities hidden")
 
 
+if __name__ == "__main__":
+    raise SystemExit(pytest.main([__file__, "-s"]))
@@ -2,32 +2,32 @@
 from __future__ import annotations
 
 import asyncio
-from contextlib import asynccontextmanager
-from pathlib import Path
 from types import MappingProxyType
-import sys
 
 import pytest
 
+try:
+    import uvloop
+except ImportError:  # optional, e.g. not available on Windows
+    uvloop = None
+
 from homeassistant.config_entries import ConfigEntries, ConfigEntry, ConfigEntryState
 from homeassistant.const import EVENT_HOMEASSISTANT_STARTED
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CoreState, HomeAssistant
 from homeassistant.helpers import area_registry as ar, device_registry as dr, entity_registry as er
 
-sys.path.append(str(Path(__file__).resolve().parents[1]))
-
-from custom_components.auto_area_assign import DOMAIN, SERVICE_REFRESH, async_setup
-
+from custom_components import auto_area_assign
+from custom_components.auto_area_assign import (
+    DOMAIN,
+    SERVICE_REFRESH,
+    async_setup,
+    async_unload_entry,
+)
 
-@asynccontextmanager
-async def _hass_environment(tmp_path):
-    """Provision a running Home Assistant core with loaded registries."""
-
-    hass = HomeAssistant(str(tmp_path))
-    hass.config_entries = ConfigEntries(hass, {})
-    await hass.config_entries.async_initialize()
 
-    config_entry = ConfigEntry(
+def make_config_entry(entry_id: str = "test-entry") -> ConfigEntry:
+    """Build the config entry the test devices and entities belong to."""
+    return ConfigEntry(
         domain="test_domain",
         title="Test Entry",
         data={},
@@ -37,353 +37,280 @@ async def _hass_environment(tmp_path):
         minor_version=1,
         discovery_keys=MappingProxyType({}),
         unique_id=None,
-        entry_id="test-entry",
+        entry_id=entry_id,
         pref_disable_new_entities=None,
         pref_disable_polling=None,
         disabled_by=None,
         state=ConfigEntryState.NOT_LOADED,
     )
-    hass.config_entries._entries[config_entry.entry_id] = config_entry
 
-    await hass.async_start()
 
-    area_reg = ar.async_get(hass)
-    device_reg = dr.async_get(hass)
-    entity_reg = er.async_get(hass)
-
-    await area_reg.async_load()
-    await device_reg.async_load()
-    await entity_reg.async_load()
-
-    try:
-        yield hass, config_entry, area_reg, device_reg, entity_reg
-    finally:
-        await hass.async_stop()
-        await hass.async_block_till_done()
-
-
-def _run_async_test(coro):
-    """Helper to execute asynchronous test bodies without pytest-asyncio."""
+def make_entity(entity_reg, config_entry, domain, object_id, device_id=None):
+    """Register a test_platform entity; its object_id drives area matching."""
+    return entity_reg.async_get_or_create(
+        domain,
+        "test_platform",
+        f"unique-{object_id}",
+        suggested_object_id=object_id,
+        config_entry=config_entry,
+        device_id=device_id,
+    )
 
-    return asyncio.run(coro)
 
+async def _async_start_env(tmp_path):
+    """Provision a running Home Assistant core with loaded registries."""
 
-def test_assigns_area_via_refresh_service(tmp_path):
-    async def _test():
-        async with _hass_environment(tmp_path) as (
-            hass,
-            config_entry,
-            area_reg,
-            device_reg,
-            entity_reg,
-        ):
-            kitchen = area_reg.async_create("Kitchen", aliases={"kitchen", "Kitchen"})
-            device = device_reg.async_get_or_create(
-                config_entry_id=config_entry.entry_id,
-                identifiers={("auto-area", "device-1")},
-            )
-            entity_reg.async_get_or_create(
-                "light",
-                "test_platform",
-                "unique-1",
-                suggested_object_id="kitchen_ceiling",
-                config_entry=config_entry,
-                device_id=device.id,
-            )
+    hass = HomeAssistant(str(tmp_path))
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
 
-            assert await async_setup(hass, {})
-            await hass.async_block_till_done()
+    config_entry = make_config_entry()
+    hass.config_entries._entries[config_entry.entry_id] = config_entry
 
-            await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
-            await hass.async_block_till_done()
+    await hass.async_start()
 
-            updated_device = device_reg.async_get(device.id)
-            assert updated_device.area_id == kitchen.id
+    area_reg = ar.async_get(hass)
+    device_reg = dr.async_get(hass)
+    entity_reg = er.async_get(hass)
 
-    _run_async_test(_test())
+    # Independent store files, loaded together as bootstrap does
+    await asyncio.gather(
+        area_reg.async_load(),
+        device_reg.async_load(),
+        entity_reg.async_load(),
+    )
 
+    return hass, config_entry, area_reg, device_reg, entity_reg
 
-def test_does_not_override_existing_area(tmp_path):
-    async def _test():
-        async with _hass_environment(tmp_path) as (
-            hass,
-            config_entry,
-            area_reg,
-            device_reg,
-            entity_reg,
-        ):
-            area_reg.async_create("Bedroom", aliases={"bedroom"})
-            other_area = area_reg.async_create("Garage", aliases={"garage"})
-
-            device = device_reg.async_get_or_create(
-                config_entry_id=config_entry.entry_id,
-                identifiers={("auto-area", "device-2")},
-            )
-            device_reg.async_update_device(device.id, area_id=other_area.id)
-
-            entity_reg.async_get_or_create(
-                "switch",
-                "test_platform",
-                "unique-2",
-                suggested_object_id="bedroom_lamp",
-                config_entry=config_entry,
-                device_id=device.id,
-            )
 
-            assert await async_setup(hass, {})
-            await hass.async_block_till_done()
+async def _async_stop_env(hass):
+    """Stop the Home Assistant core started by _async_start_env."""
+    await hass.async_stop()
+    await hass.async_block_till_done()
 
-            await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
-            await hass.async_block_till_done()
 
-            updated_device = device_reg.async_get(device.id)
-            assert updated_device.area_id == other_area.id
+@pytest.fixture(scope="module")
+def loop():
+    """Event loop shared by every test in this module, on uvloop when installed."""
+    loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+    yield loop
+    loop.close()
 
-    _run_async_test(_test())
 
+@pytest.fixture(scope="module")
+def hass_env(loop, tmp_path_factory):
+    """Start Home Assistant once for the whole module."""
+    environment = loop.run_until_complete(
+        _async_start_env(tmp_path_factory.mktemp("hass"))
+    )
+    yield environment
+    loop.run_until_complete(_async_stop_env(environment[0]))
+
+
+@pytest.fixture(autouse=True)
+def _clean_hass(loop, hass_env):
+    """Reset registries and the integration after each test."""
+    yield
+    loop.run_until_complete(_async_reset(*hass_env))
+
+
+async def _async_reset(hass, config_entry, area_reg, device_reg, entity_reg):
+    """Remove everything a test created so the next one starts empty."""
+    await hass.async_block_till_done()
+    for entity_id in list(entity_reg.entities):
+        entity_reg.async_remove(entity_id)
+    for device_id in list(device_reg.devices):
+        device_reg.async_remove_device(device_id)
+    for area in list(area_reg.async_list_areas()):
+        area_reg.async_delete(area.id)
+    if DOMAIN in hass.data:
+        # Drops the refresh service and any STARTED listener this test left
+        assert await async_unload_entry(hass, None)
+    hass.data.pop(DOMAIN, None)
+    await hass.async_block_till_done()
+
+
+def _run_async_test(loop, coro):
+    """Helper to execute asynchronous test bodies without pytest-asyncio."""
 
-def test_assigns_on_homeassistant_started_event(tmp_path):
+    return loop.run_until_complete(coro)
+
+
+@pytest.mark.parametrize(
+    ("object_id", "existing_area", "labels", "expected_area"),
+    [
+        pytest.param("kitchen_ceiling", None, set(), "Kitchen", id="assigns_area"),
+        pytest.param(
+            "bedroom_lamp", "Garage", set(), "Garage", id="keeps_existing_area"
+        ),
+        pytest.param(
+            "garage_light", None, {"auto_area_ignore"}, None, id="ignores_labelled"
+        ),
+    ],
+)
+def test_refresh_service_assigns_device_area(
+    loop, hass_env, object_id, existing_area, labels, expected_area
+):
     async def _test():
-        async with _hass_environment(tmp_path) as (
-            hass,
-            config_entry,
-            area_reg,
-            device_reg,
-            entity_reg,
-        ):
-            hallway = area_reg.async_create("Hallway", aliases={"hall"})
-
-            device = device_reg.async_get_or_create(
-                config_entry_id=config_entry.entry_id,
-                identifiers={("auto-area", "device-3")},
-            )
-            entity_reg.async_get_or_create(
-                "sensor",
-                "test_platform",
-                "unique-3",
-                suggested_object_id="hall_motion",
-                config_entry=config_entry,
-                device_id=device.id,
+        hass, config_entry, area_reg, device_reg, entity_reg = hass_env
+        areas = {
+            name: area_reg.async_create(name, aliases={alias})
+            for name, alias in (
+                ("Kitchen", "kitchen"),
+                ("Bedroom", "bedroom"),
+                ("Garage", "garage"),
             )
+        }
 
-            assert await async_setup(hass, {})
-            await hass.async_block_till_done()
+        device = device_reg.async_get_or_create(
+            config_entry_id=config_entry.entry_id,
+            identifiers={("auto-area", object_id)},
+        )
+        if existing_area:
+            device_reg.async_update_device(device.id, area_id=areas[existing_area].id)
+        if labels:
+            device_reg.async_update_device(device.id, labels=labels)
 
-            # Ensure we start from a clean state after the initial background run.
-            device_reg.async_update_device(device.id, area_id=None)
+        make_entity(entity_reg, config_entry, "light", object_id, device_id=device.id)
 
-            hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
-            await hass.async_block_till_done()
-
-            updated_device = device_reg.async_get(device.id)
-            assert updated_device.area_id == hallway.id
-
-    _run_async_test(_test())
-
-
-def test_assigns_area_to_entity_without_device(tmp_path):
-    """Test that entities without devices get area assigned directly."""
-    async def _test():
-        async with _hass_environment(tmp_path) as (
-            hass,
-            config_entry,
-            area_reg,
-            device_reg,
-            entity_reg,
-        ):
-            kitchen = area_reg.async_create("Kitchen", aliases={"kitchen"})
-            
-            # Create entity without device
-            entity = entity_reg.async_get_or_create(
-                "sensor",
-                "test_platform",
-                "unique-standalone",
-                suggested_object_id="kitchen_temperature",
-                config_entry=config_entry,
-            )
-
-            assert await async_setup(hass, {})
-            await hass.async_block_till_done()
+        assert await async_setup(hass, {})
 
-            await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
-            await hass.async_block_till_done()
+        # blocking=True returns once the refresh run has finished
+        await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
 
-            updated_entity = entity_reg.async_get(entity.entity_id)
-            assert updated_entity.area_id == kitchen.id
+        updated_device = device_reg.async_get(device.id)
+        expected_area_id = areas[expected_area].id if expected_area else None
+        assert updated_device.area_id == expected_area_id
 
-    _run_async_test(_test())
+    _run_async_test(loop, _test())
 
 
-def test_does_not_assign_entity_without_device_with_existing_area(tmp_path):
-    """Test that entities without devices that already have area are not changed."""
+def test_assigns_on_homeassistant_started_event(loop, hass_env, monkeypatch):
     async def _test():
-        async with _hass_environment(tmp_path) as (
-            hass,
-            config_entry,
-            area_reg,
-            device_reg,
-            entity_reg,
-        ):
-            bedroom = area_reg.async_create("Bedroom", aliases={"bedroom"})
-            living_room = area_reg.async_create("Living Room", aliases={"living_room"})
-            
-            # Create entity without device and assign it to living_room
-            entity = entity_reg.async_get_or_create(
-                "sensor",
-                "test_platform",
-                "unique-standalone-2",
-                suggested_object_id="bedroom_humidity",
-                config_entry=config_entry,
-            )
-            entity_reg.async_update_entity(entity.entity_id, area_id=living_room.id)
-
-            assert await async_setup(hass, {})
-            await hass.async_block_till_done()
+        hass, config_entry, area_reg, device_reg, entity_reg = hass_env
+        hallway = area_reg.async_create("Hallway", aliases={"hall"})
 
-            await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
-            await hass.async_block_till_done()
+        device = device_reg.async_get_or_create(
+            config_entry_id=config_entry.entry_id,
+            identifiers={("auto-area", "device-3")},
+        )
+        make_entity(entity_reg, config_entry, "sensor", "hall_motion", device_id=device.id)
 
-            updated_entity = entity_reg.async_get(entity.entity_id)
-            # Should still be assigned to living_room, not bedroom
-            assert updated_entity.area_id == living_room.id
+        # Wait for the run the event starts rather than for the whole loop
+        assigned = asyncio.Event()
+        assign_areas = auto_area_assign._async_assign_areas
 
-    _run_async_test(_test())
+        async def _assign_and_signal(hass):
+            await assign_areas(hass)
+            assigned.set()
 
+        monkeypatch.setattr(auto_area_assign, "_async_assign_areas", _assign_and_signal)
 
-def test_ignores_entity_with_auto_area_ignore_label(tmp_path):
-    """Test that entities with auto_area_ignore label are ignored."""
-    async def _test():
-        async with _hass_environment(tmp_path) as (
-            hass,
-            config_entry,
-            area_reg,
-            device_reg,
-            entity_reg,
-        ):
-            bathroom = area_reg.async_create("Bathroom", aliases={"bathroom"})
-            
-            # Create entity without device but with ignore label
-            entity = entity_reg.async_get_or_create(
-                "sensor",
-                "test_platform",
-                "unique-ignored",
-                suggested_object_id="bathroom_motion",
-                config_entry=config_entry,
-            )
-            entity_reg.async_update_entity(
-                entity.entity_id, 
-                labels={"auto_area_ignore"}
-            )
-
+        # Loaded while still starting, the run has to wait for the started event
+        hass.set_state(CoreState.starting)
+        try:
             assert await async_setup(hass, {})
             await hass.async_block_till_done()
+            assert not assigned.is_set()
 
-            await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
-            await hass.async_block_till_done()
-
-            updated_entity = entity_reg.async_get(entity.entity_id)
-            # Should not have area assigned
-            assert updated_entity.area_id is None
-
-    _run_async_test(_test())
-
-
-def test_ignores_device_with_auto_area_ignore_label(tmp_path):
-    """Test that devices with auto_area_ignore label are ignored."""
+            hass.set_state(CoreState.running)
+            hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+            await asyncio.wait_for(assigned.wait(), timeout=5)
+        finally:
+            hass.set_state(CoreState.running)
+
+        updated_device = device_reg.async_get(device.id)
+        assert updated_device.area_id == hallway.id
+
+    _run_async_test(loop, _test())
+
+
+@pytest.mark.parametrize(
+    ("object_id", "existing_area", "labels", "expected_area"),
+    [
+        pytest.param(
+            "kitchen_temperature", None, set(), "Kitchen", id="assigns_area"
+        ),
+        pytest.param(
+            "bedroom_humidity",
+            "Living Room",
+            set(),
+            "Living Room",
+            id="keeps_existing_area",
+        ),
+        pytest.param(
+            "bathroom_motion", None, {"auto_area_ignore"}, None, id="ignores_labelled"
+        ),
+    ],
+)
+def test_refresh_service_assigns_entity_without_device_area(
+    loop, hass_env, object_id, existing_area, labels, expected_area
+):
+    """Test area assignment for entities that have no device."""
     async def _test():
-        async with _hass_environment(tmp_path) as (
-            hass,
-            config_entry,
-            area_reg,
-            device_reg,
-            entity_reg,
-        ):
-            garage = area_reg.async_create("Garage", aliases={"garage"})
-            
-            # Create device with ignore label
-            device = device_reg.async_get_or_create(
-                config_entry_id=config_entry.entry_id,
-                identifiers={("auto-area", "device-ignored")},
-            )
-            device_reg.async_update_device(
-                device.id,
-                labels={"auto_area_ignore"}
+        hass, config_entry, area_reg, device_reg, entity_reg = hass_env
+        areas = {
+            name: area_reg.async_create(name, aliases={alias})
+            for name, alias in (
+                ("Kitchen", "kitchen"),
+                ("Bedroom", "bedroom"),
+                ("Living Room", "living_room"),
+                ("Bathroom", "bathroom"),
             )
-            
-            # Create entity linked to this device
-            entity_reg.async_get_or_create(
-                "light",
-                "test_platform",
-                "unique-device-ignored",
-                suggested_object_id="garage_light",
-                config_entry=config_entry,
-                device_id=device.id,
+        }
+
+        # Create entity without device
+        entity = make_entity(entity_reg, config_entry, "sensor", object_id)
+        if existing_area:
+            entity_reg.async_update_entity(
+                entity.entity_id, area_id=areas[existing_area].id
             )
+        if labels:
+            entity_reg.async_update_entity(entity.entity_id, labels=labels)
 
-            assert await async_setup(hass, {})
-            await hass.async_block_till_done()
+        assert await async_setup(hass, {})
 
-            await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
-            await hass.async_block_till_done()
+        # blocking=True returns once the refresh run has finished
+        await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
 
-            updated_device = device_reg.async_get(device.id)
-            # Should not have area assigned
-            assert updated_device.area_id is None
+        updated_entity = entity_reg.async_get(entity.entity_id)
+        expected_area_id = areas[expected_area].id if expected_area else None
+        assert updated_entity.area_id == expected_area_id
 
-    _run_async_test(_test())
+    _run_async_test(loop, _test())
 
 
-def test_assigns_entity_without_device_and_ignores_device_with_label_in_same_run(tmp_path):
+def test_assigns_entity_without_device_and_ignores_device_with_label_in_same_run(loop, hass_env):
     """Test mixed scenario: assign to entity without device, ignore device with label."""
     async def _test():
-        async with _hass_environment(tmp_path) as (
-            hass,
-            config_entry,
-            area_reg,
-            device_reg,
-            entity_reg,
-        ):
-            office = area_reg.async_create("Office", aliases={"office"})
-            
-            # Entity without device - should be assigned
-            entity1 = entity_reg.async_get_or_create(
-                "sensor",
-                "test_platform",
-                "unique-office-temp",
-                suggested_object_id="office_temperature",
-                config_entry=config_entry,
-            )
-            
-            # Device with ignore label - should be ignored
-            device = device_reg.async_get_or_create(
-                config_entry_id=config_entry.entry_id,
-                identifiers={("auto-area", "device-office-ignored")},
-            )
-            device_reg.async_update_device(
-                device.id,
-                labels={"auto_area_ignore"}
-            )
-            entity_reg.async_get_or_create(
-                "light",
-                "test_platform",
-                "unique-office-light",
-                suggested_object_id="office_light",
-                config_entry=config_entry,
-                device_id=device.id,
-            )
-
-            assert await async_setup(hass, {})
-            await hass.async_block_till_done()
-
-            await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
-            await hass.async_block_till_done()
-
-            # Entity without device should have area
-            updated_entity1 = entity_reg.async_get(entity1.entity_id)
-            assert updated_entity1.area_id == office.id
-            
-            # Device with label should not have area
-            updated_device = device_reg.async_get(device.id)
-            assert updated_device.area_id is None
-
-    _run_async_test(_test())
+        hass, config_entry, area_reg, device_reg, entity_reg = hass_env
+        office = area_reg.async_create("Office", aliases={"office"})
+        
+        # Entity without device - should be assigned
+        entity1 = make_entity(entity_reg, config_entry, "sensor", "office_temperature")
+        
+        # Device with ignore label - should be ignored
+        device = device_reg.async_get_or_create(
+            config_entry_id=config_entry.entry_id,
+            identifiers={("auto-area", "device-office-ignored")},
+        )
+        device_reg.async_update_device(
+            device.id,
+            labels={"auto_area_ignore"}
+        )
+        make_entity(entity_reg, config_entry, "light", "office_light", device_id=device.id)
+
+        assert await async_setup(hass, {})
+
+        # blocking=True returns once the refresh run has finished
+        await hass.services.async_call(DOMAIN, SERVICE_REFRESH, {}, blocking=True)
+
+        # Entity without device should have area
+        updated_entity1 = entity_reg.async_get(entity1.entity_id)
+        assert updated_entity1.area_id == office.id
+        
+        # Device with label should not have area
+        updated_device = device_reg.async_get(device.id)
+        assert updated_device.area_id is None
+
+    _run_async_test(loop, _test())
@@ -2,121 +2,224 @@
 from __future__ import annotations
 
 import json
+import logging
+from pathlib import Path
 import subprocess
 import time
-from pathlib import Path
 
 import pytest
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from orjson import loads as json_loads
+except ImportError:  # optional, the stdlib parser is enough for a small registry
+    json_loads = json.loads
+
+pytestmark = pytest.mark.docker
+
+LOGGER = logging.getLogger(__name__)
 
 
-DOCKER_COMPOSE_FILE = Path(__file__).parent / "docker-compose.yml"
 CONTAINER_NAME = "ha_test"
+# docker-compose.yml bind-mounts this directory as /config
+HA_CONFIG_DIR = Path(__file__).parent / "ha_config"
 HA_URL = "http://localhost:8123"
 API_HEADERS = {"Authorization": "Bearer your_token_here"}
+SOURCE_LIGHTS = ("light.ceiling_lights", "light.bed_light")
+
+# One keep-alive connection pool for every REST call in this module
+SESSION = requests.Session()
+SESSION.headers.update(API_HEADERS)
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=10))
 
 
-def run_docker_command(command: list[str]) -> tuple[int, str, str]:
-    """Run a docker exec command."""
+def run_docker_command(command: list[str]) -> tuple[int, bytes]:
+    """Run a docker exec command and return its exit code and raw stdout."""
     full_command = ["docker", "exec", CONTAINER_NAME] + command
     result = subprocess.run(
-        full_command, capture_output=True, text=True, timeout=30
+        full_command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        timeout=30,
     )
-    return result.returncode, result.stdout, result.stderr
+    return result.returncode, result.stdout
 
 
 def wait_for_ha_ready(timeout: int = 60) -> bool:
     """Wait for Home Assistant to be ready."""
-    start_time = time.time()
-    while time.time() - start_time < timeout:
+    deadline = time.monotonic() + timeout
+    # Probe often at first, then back off so a slow start is not hammered
+    delay = 0.1
+    while time.monotonic() < deadline:
         try:
-            response = requests.get(f"{HA_URL}/api/", timeout=5)
+            response = SESSION.get(f"{HA_URL}/api/", timeout=1)
             # API returns 401 when it's ready but requires auth
             if response.status_code in (200, 401):
                 return True
         except requests.exceptions.RequestException:
             pass
-        time.sleep(2)
+        time.sleep(delay)
+        delay = min(delay * 1.5, 1.0)
     return False
 
 
 def get_entity_state(entity_id: str) -> dict | None:
     """Get entity state via REST API."""
     try:
-        response = requests.get(
+        response = SESSION.get(
             f"{HA_URL}/api/states/{entity_id}",
             timeout=5,
         )
         if response.status_code == 200:
             return response.json()
     except requests.exceptions.RequestException as e:
-        print(f"Error getting entity state: {e}")
+        LOGGER.warning("Error getting entity state: %s", e)
     return None
 
 
+def get_all_states() -> dict[str, dict]:
+    """Get every entity state with one REST call, keyed by entity_id."""
+    try:
+        response = SESSION.get(f"{HA_URL}/api/states", timeout=5)
+        if response.status_code == 200:
+            return {state["entity_id"]: state for state in response.json()}
+    except requests.exceptions.RequestException as e:
+        LOGGER.warning("Error getting entity states: %s", e)
+    return {}
+
+
 def set_entity_state(entity_id: str, service: str, **kwargs) -> bool:
     """Call a service on an entity."""
     domain = entity_id.split(".")[0]
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{HA_URL}/api/services/{domain}/{service}",
             json={"entity_id": entity_id, **kwargs},
             timeout=5,
         )
         return response.status_code in (200, 201)
     except requests.exceptions.RequestException as e:
-        print(f"Error calling service: {e}")
+        LOGGER.warning("Error calling service: %s", e)
         return False
 
 
+def write_entity_state(entity_id: str, state: str, attributes: dict) -> bool:
+    """Write a state straight to the state machine, bypassing the integration."""
+    try:
+        response = SESSION.post(
+            f"{HA_URL}/api/states/{entity_id}",
+            json={"state": state, "attributes": attributes},
+            timeout=5,
+        )
+        return response.status_code in (200, 201)
+    except requests.exceptions.RequestException as e:
+        LOGGER.warning("Error writing state: %s", e)
+        return False
+
+
+def wait_for(predicate, timeout: float = 5.0, interval: float = 0.1):
+    """Poll predicate until it returns a truthy value or timeout passes.
+
+    Returns the last value predicate produced.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        value = predicate()
+        if value or time.monotonic() >= deadline:
+            return value
+        time.sleep(interval)
+
+
+def wait_for_state(entity_id: str, condition, timeout: float = 5.0) -> dict | None:
+    """Poll an entity until condition(state) holds and return its last state."""
+    state = None
+
+    def _poll() -> bool:
+        nonlocal state
+        state = get_entity_state(entity_id)
+        return state is not None and condition(state)
+
+    wait_for(_poll, timeout)
+    return state
+
+
+def wait_for_states(condition, timeout: float = 5.0) -> dict[str, dict]:
+    """Poll all entity states until condition(states) holds and return the last snapshot."""
+    states: dict[str, dict] = {}
+
+    def _poll() -> bool:
+        nonlocal states
+        states = get_all_states()
+        return condition(states)
+
+    wait_for(_poll, timeout)
+    return states
+
+
+def get_position(state: dict) -> int | None:
+    """Return the current_position attribute of a valve state."""
+    return state.get("attributes", {}).get("current_position")
+
+
 def get_entity_registry() -> dict:
-    """Get entity registry data via docker exec."""
-    returncode, stdout, stderr = run_docker_command(
+    """Get entity registry data from the bind-mounted config directory."""
+    try:
+        return json_loads(
+            (HA_CONFIG_DIR / ".storage" / "core.entity_registry").read_bytes()
+        )
+    except OSError:
+        pass
+
+    # Not readable from the host, e.g. owned by the container's root user
+    returncode, stdout = run_docker_command(
         ["cat", "/config/.storage/core.entity_registry"]
     )
     if returncode == 0:
-        return json.loads(stdout)
+        return json_loads(stdout)
     return {}
 
 
-def check_entity_hidden(entity_id: str) -> bool:
-    """Check if entity is hidden."""
+def get_hidden_entities() -> set[str]:
+    """Return the entity_ids the registry marks as hidden by an integration."""
     registry = get_entity_registry()
-    for entry in registry.get("data", {}).get("entities", []):
-        if entry.get("entity_id") == entity_id:
-            return entry.get("hidden_by") == "integration"
-    return False
+    return {
+        entry["entity_id"]
+        for entry in registry.get("data", {}).get("entities", [])
+        if entry.get("hidden_by") == "integration"
+    }
+
+
+def wait_for_hidden(entity_ids, timeout: float = 5.0) -> set[str]:
+    """Poll the registry until all entity_ids are hidden and return those that are."""
+    hidden: set[str] = set()
+
+    def _poll() -> bool:
+        nonlocal hidden
+        hidden = get_hidden_entities().intersection(entity_ids)
+        return len(hidden) == len(entity_ids)
+
+    wait_for(_poll, timeout)
+    return hidden
 
 
 @pytest.fixture(scope="module")
-def docker_ha():
-    """Start Home Assistant in Docker."""
-    # Start docker compose
-    subprocess.run(
-        ["docker", "compose", "-f", str(DOCKER_COMPOSE_FILE), "up", "-d"],
-        check=True,
-        cwd=DOCKER_COMPOSE_FILE.parent,
-    )
-    
-    # Wait for HA to be ready
+def docker_ha(ha_container):
+    """Wait for the shared Home Assistant container to be ready."""
+    # ha_container yields once startup is logged; make sure the API answers too
     if not wait_for_ha_ready(timeout=120):
-        # Stop docker compose
-        subprocess.run(
-            ["docker", "compose", "-f", str(DOCKER_COMPOSE_FILE), "down"],
-            cwd=DOCKER_COMPOSE_FILE.parent,
-        )
         pytest.fail("Home Assistant did not start in time")
-    
-    # Give HA some time to fully initialize
-    time.sleep(10)
-    
+
     yield
-    
-    # Cleanup: stop docker compose
-    subprocess.run(
-        ["docker", "compose", "-f", str(DOCKER_COMPOSE_FILE), "down", "-v"],
-        cwd=DOCKER_COMPOSE_FILE.parent,
-    )
+
+    SESSION.close()
+
+
+@pytest.fixture(autouse=True)
+def reset_entities(docker_ha):
+    """Turn the source lights off so every test starts from the same state."""
+    for light in SOURCE_LIGHTS:
+        set_entity_state(light, "turn_off")
 
 
 def test_valve_entities_created(docker_ha):
@@ -128,45 +231,41 @@ def test_valve_entities_created(docker_ha):
     assert valve1_state is not None, "valve.ceiling_lights should exist"
     assert valve2_state is not None, "valve.bed_light should exist"
     
-    print(f"Valve 1 state: {valve1_state}")
-    print(f"Valve 2 state: {valve2_state}")
+    LOGGER.debug("Valve 1 state: %s", valve1_state)
+    LOGGER.debug("Valve 2 state: %s", valve2_state)
 
 
 def test_light_entities_hidden(docker_ha):
     """Test that source light entities are hidden."""
-    time.sleep(5)  # Wait for integration to hide lights
-    
-    assert check_entity_hidden("light.ceiling_lights"), "light.ceiling_lights should be hidden"
-    assert check_entity_hidden("light.bed_light"), "light.bed_light should be hidden"
+    # Wait for integration to hide lights, reading the registry once per poll
+    hidden = wait_for_hidden(SOURCE_LIGHTS)
+    assert "light.ceiling_lights" in hidden, "light.ceiling_lights should be hidden"
+    assert "light.bed_light" in hidden, "light.bed_light should be hidden"
 
 
 def test_normally_open_sync_light_to_valve(docker_ha):
     """Test normally_open: light brightness -> valve position sync."""
     # Set light brightness to 100% (valve should be 0% - closed)
     assert set_entity_state("light.ceiling_lights", "turn_on", brightness=255)
-    time.sleep(2)
-    
-    valve_state = get_entity_state("valve.ceiling_lights")
+    valve_state = wait_for_state("valve.ceiling_lights", lambda s: get_position(s) == 0)
     assert valve_state is not None
-    position = valve_state.get("attributes", {}).get("current_position")
+    position = get_position(valve_state)
     assert position == 0, f"NO valve at 100% brightness should be 0% open, got {position}"
     
     # Set light brightness to 0% (valve should be 100% - open)
     assert set_entity_state("light.ceiling_lights", "turn_off")
-    time.sleep(2)
-    
-    valve_state = get_entity_state("valve.ceiling_lights")
+    valve_state = wait_for_state("valve.ceiling_lights", lambda s: get_position(s) == 100)
     assert valve_state is not None
-    position = valve_state.get("attributes", {}).get("current_position")
+    position = get_position(valve_state)
     assert position == 100, f"NO valve at 0% brightness should be 100% open, got {position}"
     
     # Set light brightness to 50% (valve should be ~50%)
     assert set_entity_state("light.ceiling_lights", "turn_on", brightness=128)
-    time.sleep(2)
-    
-    valve_state = get_entity_state("valve.ceiling_lights")
+    valve_state = wait_for_state(
+        "valve.ceiling_lights", lambda s: 45 <= (get_position(s) or 0) <= 55
+    )
     assert valve_state is not None
-    position = valve_state.get("attributes", {}).get("current_position")
+    position = get_position(valve_state)
     assert 45 <= position <= 55, f"NO valve at 50% brightness should be ~50% open, got {position}"
 
 
@@ -174,38 +273,50 @@ def test_normally_closed_sync_light_to_valve(docker_ha):
     """Test normally_closed: light brightness -> valve position sync."""
     # Set light brightness to 100% (valve should be 100% - open)
     assert set_entity_state("light.bed_light", "turn_on", brightness=255)
-    time.sleep(2)
-    
-    valve_state = get_entity_state("valve.bed_light")
+    valve_state = wait_for_state("valve.bed_light", lambda s: get_position(s) == 100)
     assert valve_state is not None
-    position = valve_state.get("attributes", {}).get("current_position")
+    position = get_position(valve_state)
     assert position == 100, f"NC valve at 100% brightness should be 100% open, got {position}"
     
     # Set light brightness to 0% (valve should be 0% - closed)
     assert set_entity_state("light.bed_light", "turn_off")
-    time.sleep(2)
-    
-    valve_state = get_entity_state("valve.bed_light")
+    valve_state = wait_for_state("valve.bed_light", lambda s: get_position(s) == 0)
     assert valve_state is not None
-    position = valve_state.get("attributes", {}).get("current_position")
+    position = get_position(valve_state)
     assert position == 0, f"NC valve at 0% brightness should be 0% open, got {position}"
 
 
+def test_light_on_without_brightness(docker_ha):
+    """Test that a light reporting brightness None while on closes the valve."""
+    assert set_entity_state("light.bed_light", "turn_on", brightness=255)
+    assert wait_for_state("valve.bed_light", lambda s: get_position(s) == 100)
+
+    assert write_entity_state("light.bed_light", "on", {"brightness": None})
+    valve_state = wait_for_state("valve.bed_light", lambda s: get_position(s) == 0)
+    assert valve_state is not None
+    position = get_position(valve_state)
+    assert position == 0, f"NC valve without brightness should be 0% open, got {position}"
+
+
 def test_valve_control_updates_light_no(docker_ha):
     """Test valve control updates light brightness for normally_open."""
+    # reset_entities left the light off; turn it on so opening has to change it
+    assert set_entity_state("light.ceiling_lights", "turn_on", brightness=255)
+    light_state = wait_for_state("light.ceiling_lights", lambda s: s.get("state") == "on")
+    assert light_state is not None and light_state.get("state") == "on"
+
     # Open valve (position 100) -> light should be off (brightness 0)
     assert set_entity_state("valve.ceiling_lights", "open_valve")
-    time.sleep(2)
-    
-    light_state = get_entity_state("light.ceiling_lights")
+    light_state = wait_for_state("light.ceiling_lights", lambda s: s.get("state") == "off")
     assert light_state is not None
     assert light_state.get("state") == "off", "NO valve open should turn light off"
     
     # Close valve (position 0) -> light should be on (brightness 255)
     assert set_entity_state("valve.ceiling_lights", "close_valve")
-    time.sleep(2)
-    
-    light_state = get_entity_state("light.ceiling_lights")
+    light_state = wait_for_state(
+        "light.ceiling_lights",
+        lambda s: s.get("attributes", {}).get("brightness") == 255,
+    )
     assert light_state is not None
     assert light_state.get("state") == "on", "NO valve close should turn light on"
     brightness = light_state.get("attributes", {}).get("brightness")
@@ -216,9 +327,10 @@ def test_valve_control_updates_light_nc(docker_ha):
     """Test valve control updates light brightness for normally_closed."""
     # Open valve (position 100) -> light should be on (brightness 255)
     assert set_entity_state("valve.bed_light", "open_valve")
-    time.sleep(2)
-    
-    light_state = get_entity_state("light.bed_light")
+    light_state = wait_for_state(
+        "light.bed_light",
+        lambda s: s.get("attributes", {}).get("brightness") == 255,
+    )
     assert light_state is not None
     assert light_state.get("state") == "on", "NC valve open should turn light on"
     brightness = light_state.get("attributes", {}).get("brightness")
@@ -226,9 +338,7 @@ def test_valve_control_updates_light_nc(docker_ha):
     
     # Close valve (position 0) -> light should be off
     assert set_entity_state("valve.bed_light", "close_valve")
-    time.sleep(2)
-    
-    light_state = get_entity_state("light.bed_light")
+    light_state = wait_for_state("light.bed_light", lambda s: s.get("state") == "off")
     assert light_state is not None
     assert light_state.get("state") == "off", "NC valve close should turn light off"
 
@@ -237,22 +347,33 @@ def test_valve_set_position(docker_ha):
     """Test setting valve position directly."""
     # Set valve to 75%
     assert set_entity_state("valve.ceiling_lights", "set_valve_position", position=75)
-    time.sleep(2)
-    
-    valve_state = get_entity_state("valve.ceiling_lights")
+
+    # For NO: 75% valve = 25% brightness
+    expected_brightness = int((25 / 100) * 255)
+
+    def _synced(states: dict[str, dict]) -> bool:
+        valve = states.get("valve.ceiling_lights")
+        light = states.get("light.ceiling_lights")
+        return (
+            valve is not None
+            and light is not None
+            and get_position(valve) == 75
+            and abs((light["attributes"].get("brightness") or 0) - expected_brightness) <= 5
+        )
+
+    # Valve and light come from the same snapshot, one round-trip per poll
+    states = wait_for_states(_synced)
+
+    valve_state = states.get("valve.ceiling_lights")
     assert valve_state is not None
-    position = valve_state.get("attributes", {}).get("current_position")
+    position = get_position(valve_state)
     assert position == 75, f"Valve position should be 75%, got {position}"
-    
-    # For NO: 75% valve = 25% brightness
-    light_state = get_entity_state("light.ceiling_lights")
+
+    light_state = states.get("light.ceiling_lights")
     assert light_state is not None
     brightness = light_state.get("attributes", {}).get("brightness", 0)
-    expected_brightness = int((25 / 100) * 255)
     assert abs(brightness - expected_brightness) <= 5, \
         f"NO valve 75% should have light brightness ~{expected_brightness}, got {brightness}"
 
-
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
-